@@ -0,0 +1,98 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import APIException
+from rest_framework.utils.encoders import JSONEncoder
+
+from .authentication import ClaimsJWTAuthentication
+from .models import Category, Blog, Comment
+from .serializers import CategorySerializer, BlogSerializer, CommentSerializer
+from .conditional import acomment_validators, blog_validators, not_modified, set_validators
+from .pagination import CommentCursorPagination
+from .views import blog_list_fields, blog_page_queryset, filter_blogs, serialize_blog_page
+from . import caching
+
+# Native async versions of the read endpoints, for running under ASGI (uvicorn/daphne).
+# DRF views are synchronous, so these are plain Django async views: querysets are
+# evaluated with the async ORM and serializers only ever see prefetched rows, so
+# a waiting client never holds a thread.
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def async_api_view(view):
+    # GET-only + JWT authentication, mirroring @api_view/@permission_classes([IsAuthenticated])
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return json_response({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+        try:
+            result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+            if result is None:
+                return json_response({"detail": "Authentication credentials were not provided."}, status=401)
+            request.user, request.auth = result
+            return await view(request, *args, **kwargs)
+        except APIException as e:
+            # Same body and status as DRF's exception handler (e.g. NotFound for a bad cursor)
+            detail = e.detail if isinstance(e.detail, (list, dict)) else {"detail": e.detail}
+            return json_response(detail, status=e.status_code)
+    return wrapper
+
+
+# CATEGORY
+@async_api_view
+async def category_list(request):
+    categories = [category async for category in Category.objects.all()]
+    return json_response(CategorySerializer(categories, many=True).data)
+
+
+# BLOG
+@async_api_view
+async def blog_list(request):
+    cache_key = await caching.afeed_key(request)
+    data = await caching.aget_cached(cache_key)
+    if data is not None:
+        return json_response(data)
+
+    fields = blog_list_fields(request)
+    blogs, paginator = filter_blogs(request)
+    rows = [row async for row in paginator.page_queryset(blog_page_queryset(blogs, paginator, fields), request)]
+    data = serialize_blog_page(paginator, rows, fields)
+    await caching.aset_cached(cache_key, data)
+    return json_response(data)
+
+
+@async_api_view
+async def blog_detail(request, pk):
+    try:
+        blog = await Blog.objects.select_related('author', 'category').aget(pk=pk)
+    except Blog.DoesNotExist:
+        return json_response({"detail": "Blog not found"}, status=404)
+
+    etag, last_modified = blog_validators(blog)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    return set_validators(json_response(BlogSerializer(blog).data), etag, last_modified)
+
+
+# COMMENTS
+@async_api_view
+async def comment_list(request, blog_id):
+    try:
+        blog = await Blog.objects.aget(pk=blog_id)
+    except Blog.DoesNotExist:
+        return json_response({"detail": "Blog not found"}, status=404)
+
+    etag, last_modified = await acomment_validators(request, blog)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    comments = Comment.objects.filter(blog=blog, deleted_at__isnull=True).select_related('author')
+    paginator = CommentCursorPagination()
+    page = paginator.paginate_rows([comment async for comment in paginator.page_queryset(comments, request)])
+    data = paginator.get_paginated_data(CommentSerializer(page, many=True).data)
+    return set_validators(json_response(data), etag, last_modified)
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# JWT authentication without a User query per request. request.user is a User built
+# from the access token (user_id plus the username/email claims added by
+# MyTokenObtainPairSerializer.get_token) with every other field deferred, so it only
+# hits the database if a view reads one of them. is_active/is_admin are not taken
+# from the token: they come from a per-user cache entry that lives
+# BLOG_AUTH_CACHE_TTL seconds and is dropped on every User save/delete. With a shared
+# cache (CACHE_BACKEND) deactivation and admin changes apply on the next request;
+# with the default per-process local-memory cache only the writing process forgets
+# the entry, and other workers apply the change within BLOG_AUTH_CACHE_TTL. Writes
+# that skip signals (queryset.update()) also apply within the TTL.
+
+STATE_KEY = 'blog:auth:user:{}'
+CLAIMS = ('username', 'email')
+
+
+def user_state(user_id):
+    # (is_active, is_admin), or () for a user that no longer exists
+    key = STATE_KEY.format(user_id)
+    state = cache.get(key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values_list('is_active', 'is_admin').first() or ()
+        cache.set(key, state, settings.BLOG_AUTH_CACHE_TTL)
+    return state
+
+
+def forget_user(user_id):
+    key = STATE_KEY.format(user_id)
+    cache.delete(key)
+    # Again after commit: a request may reload the old row before the write commits
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        # Password-based revocation needs the stored hash: use the regular lookup
+        if not settings.BLOG_STATELESS_AUTH or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            # The claim is a string (RefreshToken.for_user); views compare it with int pks
+            user_id = User._meta.get_field(api_settings.USER_ID_FIELD).to_python(
+                validated_token[api_settings.USER_ID_CLAIM]
+            )
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        state = user_state(user_id)
+        if not state:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, is_admin = state
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        loaded = {api_settings.USER_ID_FIELD: user_id, 'is_active': is_active, 'is_admin': is_admin}
+        loaded.update((claim, validated_token[claim]) for claim in CLAIMS if claim in validated_token)
+        # Model.from_db() expects the loaded values in field order
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded]
+        return User.from_db(DEFAULT_DB_ALIAS, names, [loaded[name] for name in names])
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared helpers for the benchmark_* management commands
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(name, latencies, elapsed, **extra):
+    # Latencies in seconds -> machine-readable summary (milliseconds)
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'name': name,
+        'requests': count,
+        'seconds': round(elapsed, 4),
+        'rps': round(count / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        **extra,
+    }
+
+
+def run_threaded(call, requests, concurrency):
+    # Runs `call()` `requests` times on `concurrency` threads; returns (latencies, elapsed)
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    return latencies, time.perf_counter() - start
+
+
+def run_async(acall, requests, concurrency):
+    # Same as run_threaded for a coroutine function, on a single event loop
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed():
+            async with semaphore:
+                start = time.perf_counter()
+                await acall()
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(timed() for _ in range(requests)))
+        return list(latencies), time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def write_report(stdout, results, as_json):
+    if as_json:
+        stdout.write(json.dumps(results, indent=2))
+        return
+    for result in results:
+        stdout.write(' '.join(f"{key}={value}" for key, value in result.items()))
@@ -0,0 +1,133 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .purge import delete_in_batches
+
+# Bloom filter in front of the refresh token blacklist. Most refresh tokens are not
+# blacklisted, so "definitely not in the filter" skips the BlacklistedToken query;
+# a hit (blacklisted, or a ~1% false positive) still asks the database.
+# Every blacklisting (BlacklistedToken post_save) is appended to a numbered log in
+# the cache backend; each process applies the entries it hasn't seen before a check,
+# and rebuilds from the database when the log has a gap, when the filter is full, or
+# every BLOG_BLACKLIST_FILTER_TTL seconds (which also drops expired tokens).
+# Processes only see each other's entries through a shared cache (CACHE_BACKEND), so
+# BLOG_BLACKLIST_FILTER is off by default with the local-memory cache.
+
+GENERATION_KEY = 'blog:blacklist:generation'
+ENTRY_KEY = 'blog:blacklist:entry:{}'
+ERROR_RATE = 0.01
+MIN_CAPACITY = 10_000
+# Rebuild instead of fetching more log entries than this
+MAX_CATCH_UP = 1000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._generation = None
+        self._loaded_at = None
+
+    def might_contain(self, jti):
+        with self._lock:
+            self._sync()
+            return jti in self._filter
+
+    def publish(self, jti):
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, 0, None)
+            generation = cache.incr(GENERATION_KEY)
+        cache.set(ENTRY_KEY.format(generation), jti, settings.BLOG_BLACKLIST_FILTER_TTL)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+    def _sync(self):
+        generation = cache.get(GENERATION_KEY)
+        if generation is None:
+            cache.add(GENERATION_KEY, 0, None)
+            generation = cache.get(GENERATION_KEY, 0)
+        stale = (
+            self._filter is None
+            or time.monotonic() - self._loaded_at > settings.BLOG_BLACKLIST_FILTER_TTL
+            or self._filter.count > self._filter.capacity
+            or not 0 <= generation - self._generation <= MAX_CATCH_UP
+        )
+        if not stale and generation > self._generation:
+            keys = [ENTRY_KEY.format(n) for n in range(self._generation + 1, generation + 1)]
+            entries = cache.get_many(keys)
+            if len(entries) == len(keys):
+                for jti in entries.values():
+                    self._filter.add(jti)
+                self._generation = generation
+            else:
+                stale = True
+        if stale:
+            self._rebuild(generation)
+
+    def _rebuild(self, generation):
+        # `generation` is read before the query: entries published meanwhile are applied
+        # again on the next sync, which is harmless
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .values_list('token__jti', flat=True)
+        )
+        self._filter = BloomFilter(max(MIN_CAPACITY, 2 * len(jtis)))
+        for jti in jtis:
+            self._filter.add(jti)
+        self._generation = generation
+        self._loaded_at = time.monotonic()
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    def check_blacklist(self):
+        if settings.BLOG_BLACKLIST_FILTER and not blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            return
+        super().check_blacklist()
+
+
+def prune_expired_tokens(batch_size=1000):
+    # Expired refresh tokens can't be used any more, blacklisted or not; their
+    # BlacklistedToken rows go with them (CASCADE)
+    return delete_in_batches(OutstandingToken.objects.filter(expires_at__lte=timezone.now()), batch_size)
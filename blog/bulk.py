@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Blog, Category
+from .slugs import unique_slugs
+from .category_cache import categories, invalidate_categories
+from . import caching, search
+
+MAX_IMPORT_ITEMS = 1000
+
+EXPORT_FIELDS = [
+    'id', 'title', 'slug', 'content', 'author__username', 'category__name',
+    'created_at', 'updated_at', 'is_published', 'publish_at',
+]
+
+
+def resolve_categories(names):
+    # name -> Category from the category cache, plus one INSERT and one SELECT for
+    # names that don't exist yet
+    names = set(names)
+    found = {name: categories.get_by_name(name) for name in names}
+    found = {name: category for name, category in found.items() if category is not None}
+    missing = names - found.keys()
+    if missing:
+        Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+        found.update((c.name, c) for c in Category.objects.filter(name__in=missing))
+        invalidate_categories()  # bulk_create skips post_save
+    return found
+
+
+def fill_pks(blogs):
+    # bulk_create() can't return ids on MySQL: read them back through the unique slug
+    missing = {blog.slug: blog for blog in blogs if blog.pk is None}
+    if missing:
+        for slug, pk in Blog.all_objects.filter(slug__in=list(missing)).values_list('slug', 'pk'):
+            missing[slug].pk = pk
+
+
+def import_blogs(items, author, batch_size=500):
+    # `items` are validated BlogImportSerializer rows. Blog.save() is bypassed, so its
+    # publish-on-save rule, the search index and the cache are handled here.
+    now = timezone.now()
+    with transaction.atomic():
+        by_name = resolve_categories(item['category_name'] for item in items)
+        blogs = []
+        for item in items:
+            item = dict(item)
+            blog = Blog(author=author, category=by_name[item.pop('category_name')], **item)
+            if blog.publish_at and blog.publish_at <= now:
+                blog.is_published = True
+            blogs.append(blog)
+        for blog, slug in zip(blogs, unique_slugs(Blog.all_objects, [blog.title for blog in blogs])):
+            blog.slug = slug
+        Blog.objects.bulk_create(blogs, batch_size=batch_size)
+        fill_pks(blogs)
+        if search.get_backend() == search.INVERTED:
+            search.rebuild_index(Blog.objects.filter(pk__in=[blog.pk for blog in blogs]), batch_size)
+    caching.invalidate()
+    return blogs
+
+
+def export_blogs(chunk_size=1000):
+    # NDJSON lines for every blog. Walks the table in primary-key ranges so memory
+    # stays bounded on every backend (MySQL drivers buffer whole result sets).
+    encoder = JSONEncoder(ensure_ascii=False)
+    last_pk = 0
+    while True:
+        rows = list(
+            Blog.objects.filter(pk__gt=last_pk).order_by('pk').values(*EXPORT_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            return
+        for row in rows:
+            yield encoder.encode({
+                'id': row['id'],
+                'title': row['title'],
+                'slug': row['slug'],
+                'content': row['content'],
+                'author': row['author__username'],
+                'category_name': row['category__name'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+                'is_published': row['is_published'],
+                'publish_at': row['publish_at'],
+            }) + '\n'
+        last_pk = rows[-1]['id']
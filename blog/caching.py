@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Response cache for the published feed and blog detail.
+# Every key embeds a generation counter; any write to blogs/categories bumps the
+# counter, so all previously cached pages become unreachable at once and simply
+# expire from the backend. Use a shared backend (memcached/redis/file) when running
+# several worker processes, otherwise each process only sees its own invalidations.
+
+GENERATION_KEY = 'blog:generation'
+
+
+def get_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seeded from the clock so a lost counter never reuses an old generation
+        cache.add(GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, int(time.time() * 1000), None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def invalidate():
+    _bump_generation()
+    # Again after commit: a request running before the write commits can cache the
+    # old rows under the new generation
+    transaction.on_commit(_bump_generation)
+
+
+def _bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def feed_key(request, *extra):
+    return f'blog:feed:{get_generation()}:{_request_digest(request, extra)}'
+
+
+async def afeed_key(request, *extra):
+    return f'blog:feed:{await aget_generation()}:{_request_digest(request, extra)}'
+
+
+def _request_digest(request, extra):
+    params = sorted(request.GET.lists())
+    # `mine=true` makes the page user specific
+    user = request.user.pk if request.GET.get('mine') == 'true' else None
+    raw = repr((request.get_host(), request.path, params, user, extra))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def detail_key(pk):
+    return f'blog:detail:{get_generation()}:{pk}'
+
+
+def get_cached(key):
+    return cache.get(key)
+
+
+def set_cached(key, data):
+    cache.set(key, data, settings.BLOG_CACHE_TIMEOUT)
+
+
+async def aget_cached(key):
+    return await cache.aget(key)
+
+
+async def aset_cached(key, data):
+    await cache.aset(key, data, settings.BLOG_CACHE_TIMEOUT)
@@ -0,0 +1,72 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Category
+
+# Process-local copy of the (small, rarely changing) category table.
+# Entries live for BLOG_CATEGORY_CACHE_TTL seconds at most; writes in any process
+# replace a version token in the shared cache backend, and every process reloads
+# as soon as it sees a token different from the one it loaded with.
+
+VERSION_KEY = 'blog:categories:version'
+
+
+class CategoryCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_name = {}
+        self._version = None
+        self._loaded_at = None
+
+    def all(self):
+        return list(self._snapshot()[0].values())
+
+    def get_by_id(self, pk):
+        return self._snapshot()[0].get(int(pk))
+
+    def get_by_name(self, name):
+        return self._snapshot()[1].get(name)
+
+    def get_or_create(self, name):
+        category = self.get_by_name(name)
+        if category is not None:
+            return category, False
+        # Category post_save invalidates every process's copy
+        return Category.objects.get_or_create(name=name)
+
+    def invalidate(self):
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+        with self._lock:
+            self._version = None
+
+    def _snapshot(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = uuid.uuid4().hex
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY)
+        with self._lock:
+            expired = self._loaded_at is None or time.monotonic() - self._loaded_at > settings.BLOG_CATEGORY_CACHE_TTL
+            if expired or version != self._version:
+                categories = list(Category.objects.order_by('pk'))
+                self._by_id = {category.pk: category for category in categories}
+                self._by_name = {category.name: category for category in categories}
+                self._version = version
+                self._loaded_at = time.monotonic()
+            return self._by_id, self._by_name
+
+
+categories = CategoryCache()
+
+
+def invalidate_categories():
+    categories.invalidate()
+    # Again after commit: a reload inside the writing transaction may have seen
+    # rows that end up rolled back
+    transaction.on_commit(categories.invalidate)
@@ -0,0 +1,60 @@
+import hashlib
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+# Conditional GET helpers (ETag / Last-Modified).
+# Views compute cheap validators first and return 304 before serializing anything.
+
+def make_etag(*parts):
+    raw = '|'.join('' if part is None else str(part) for part in parts)
+    return quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+
+
+def not_modified(request, etag, last_modified=None):
+    # Returns a 304 response when the client's copy is current, otherwise None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def blog_validators(blog):
+    # Comment counters and image variants are updated without touching updated_at
+    etag = make_etag('blog', blog.pk, blog.updated_at.isoformat(), blog.comment_count, blog.last_comment_at,
+                     blog.image_variants)
+    last_modified = max(filter(None, [blog.updated_at, blog.last_comment_at]))
+    return etag, last_modified
+
+
+# Validators for a page of comments. New comments move Blog.last_comment_at and
+# soft deletes move the newest deleted_at (an index lookup on comment_page_idx),
+# so both only ever increase; comment_count covers the rest.
+COMMENT_STATS = {'deleted': Max('deleted_at')}
+
+
+def comment_validators(request, blog):
+    return _comment_validators(request, blog, blog.comments.aggregate(**COMMENT_STATS))
+
+
+async def acomment_validators(request, blog):
+    return _comment_validators(request, blog, await blog.comments.aaggregate(**COMMENT_STATS))
+
+
+def _comment_validators(request, blog, stats):
+    timestamps = [t for t in (blog.last_comment_at, stats['deleted']) if t]
+    last_modified = max(timestamps) if timestamps else None
+    etag = make_etag(
+        'comments', blog.pk, blog.comment_count, blog.last_comment_at, stats['deleted'], request.get_full_path()
+    )
+    return etag, last_modified
@@ -0,0 +1,216 @@
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from blog.benchmarking import run_threaded, summarize, write_report
+from blog.models import Blog, Category, Comment, User
+from blog.pagination import BlogCursorPagination, CommentCursorPagination
+from blog.seeding import PASSWORD, WORDS, is_seeded, seed_data, words
+
+PREFIX = 'bench'
+
+# `path`/`data` are called per request; `auth` is None, 'user' or 'admin';
+# `share` scales --requests for routes that are slow or consume one-shot data
+Scenario = namedtuple('Scenario', 'name method path data auth expected share', defaults=(None, 'user', (200,), 1.0))
+
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a benchmark dataset (once) and drive every route in blog/urls.py from concurrent "
+        "threads through the full Django stack, reporting p50/p95/p99 latency, RPS and queries "
+        "per request for each. Use --json and --label to compare runs across commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--blogs', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for data and request mix.")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per route.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Client threads.")
+        parser.add_argument('--only', nargs='+', default=[], help="Run only routes whose name contains one of these.")
+        parser.add_argument('--label', default='', help="Added to every result, e.g. a commit hash.")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        if not is_seeded(PREFIX):
+            self.stderr.write(f"Seeding {options['users']} users, {options['blogs']} blogs, {options['comments']} comments...")
+            seed_data(users=options['users'], categories=options['categories'], blogs=options['blogs'],
+                      comments=options['comments'], seed=options['seed'], prefix=PREFIX, progress=self.stderr.write)
+        # Unexpected statuses are counted per route instead of logged one by one
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            # Every request comes from one client: without this, login/register/password
+            # reset would measure the throttles instead of the views
+            with override_settings(BLOG_METRICS_ENABLED=True, BLOG_THROTTLE_RATES={},
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                results = self.run_scenarios(options)
+        finally:
+            request_logger.setLevel(level)
+        write_report(self.stdout, results, options['json'])
+
+    # ------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------
+    def run_scenarios(self, options):
+        self.local = threading.local()
+        self.run_id = int(time.time() * 1000)
+        self.counter = itertools.count()
+        scenarios = [s for s in self.scenarios(options)
+                     if not options['only'] or any(name in s.name for name in options['only'])]
+        results = []
+        for scenario in scenarios:
+            requests = max(1, int(options['requests'] * scenario.share))
+            queries, errors = [], []
+            latencies, elapsed = run_threaded(lambda: self.request(scenario, queries, errors),
+                                              requests, options['concurrency'])
+            if errors:
+                self.stderr.write(f"{scenario.name}: {len(errors)} unexpected responses, e.g. {errors[0]}")
+            results.append(summarize(
+                scenario.name, latencies, elapsed, method=scenario.method, concurrency=options['concurrency'],
+                queries_per_request=round(sum(queries) / len(queries), 2) if queries else None,
+                errors=len(errors), label=options['label'],
+            ))
+        return results
+
+    def request(self, scenario, queries, errors):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = Client(raise_request_exception=False)
+        headers = self.headers[scenario.auth] if scenario.auth else {}
+        path = scenario.path()
+        if scenario.method == 'GET':
+            response = client.get(path, headers=headers)
+        else:
+            data = scenario.data() if scenario.data else {}
+            response = client.generic(scenario.method, path, json.dumps(data), content_type='application/json',
+                                      headers=headers)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        match = QUERIES.search(response.get('Server-Timing', ''))
+        if match:
+            queries.append(int(match.group(1)))
+        if response.status_code not in scenario.expected:
+            errors.append(f"{scenario.method} {path} -> {response.status_code}")
+
+    def scenarios(self, options):
+        rng = self.rng
+        user = User.objects.get(username=f'{PREFIX}-0')
+        admin = User.objects.get(username=f'{PREFIX}-admin')
+        self.headers = {
+            'user': {'Authorization': f"Bearer {RefreshToken.for_user(user).access_token}"},
+            'admin': {'Authorization': f"Bearer {RefreshToken.for_user(admin).access_token}"},
+        }
+        published = Blog.objects.filter(is_published=True)
+        sample = list(published.order_by('?').values('pk', 'slug', 'title')[:1000])
+        busiest = published.order_by('-comment_count').values_list('pk', flat=True).first()
+        categories = dict(Category.objects.values_list('pk', 'name'))
+        category_ids = list(categories)
+        requests = options['requests']
+
+        # Deep pages: cursors pointing at the middle of the feed / of the busiest blog's comments
+        feed_cursor = middle_cursor(BlogCursorPagination(),
+                                    published.order_by('-created_at', '-id').values('created_at', 'id'))
+        comment_cursor = middle_cursor(CommentCursorPagination(), Comment.objects.filter(blog_id=busiest)
+                                       .order_by('created_at', 'id').values('created_at', 'id'))
+
+        # One-shot inputs, prepared outside the timed section
+        refresh_tokens = [str(RefreshToken.for_user(user)) for _ in range(requests)]
+        logout_tokens = [str(RefreshToken.for_user(user)) for _ in range(requests)]
+        doomed = self.throwaway_blogs(admin, requests)
+        reset_users = User.objects.filter(username__startswith=f'{PREFIX}-').exclude(pk__in=[user.pk, admin.pk])
+        reset_links = [
+            reverse('password-reset-confirm', args=[urlsafe_base64_encode(force_bytes(u.pk)),
+                                                    default_token_generator.make_token(u)])
+            for u in reset_users.order_by('-pk')[:max(1, int(requests * 0.2))]
+        ]
+
+        def unique(kind):
+            return f'{PREFIX}-{kind}-{self.run_id}-{next(self.counter)}'
+
+        def blog():
+            return rng.choice(sample)
+
+        def new_blog():
+            return {"title": words(rng, 6), "content": words(rng, 60),
+                    "category_name": categories[rng.choice(category_ids)]}
+
+        return [
+            Scenario('register', 'POST', lambda: reverse('register'),
+                     lambda: {"username": unique('user'), "email": f"{unique('user')}@example.com",
+                              "password": PASSWORD, "password2": PASSWORD}, None, (201,), 0.2),
+            Scenario('login', 'POST', lambda: reverse('login'),
+                     lambda: {"username": user.username, "password": PASSWORD}, None, (200,), 0.2),
+            Scenario('token_refresh', 'POST', lambda: reverse('token_refresh'),
+                     lambda: {"refresh": refresh_tokens.pop()}, None),
+            Scenario('logout', 'POST', lambda: reverse('logout'),
+                     lambda: {"refresh": logout_tokens.pop()}, 'user', (205,)),
+            Scenario('category_list', 'GET', lambda: reverse('category-list-create')),
+            Scenario('category_create', 'POST', lambda: reverse('category-list-create'),
+                     lambda: {"name": unique('category')}, 'admin', (201,)),
+            Scenario('blog_list', 'GET', lambda: reverse('blog-list-create')),
+            Scenario('blog_list_deep_page', 'GET', lambda: f"{reverse('blog-list-create')}?cursor={feed_cursor}"),
+            Scenario('blog_list_category', 'GET',
+                     lambda: f"{reverse('blog-list-create')}?category={rng.choice(category_ids)}"),
+            Scenario('blog_list_search', 'GET', lambda: f"{reverse('blog-list-create')}?search={rng.choice(WORDS)}"),
+            Scenario('blog_list_excerpt', 'GET',
+                     lambda: f"{reverse('blog-list-create')}?fields=id,title,slug,content&excerpt=true"),
+            Scenario('blog_create', 'POST', lambda: reverse('blog-list-create'), new_blog, 'user', (201,)),
+            Scenario('blog_bulk_import', 'POST', lambda: reverse('blog-bulk-import'),
+                     lambda: [new_blog() for _ in range(50)], 'admin', (201,), 0.1),
+            Scenario('blog_export', 'GET', lambda: reverse('blog-export'), None, 'admin', (200,), 0.01),
+            Scenario('blog_detail', 'GET', lambda: reverse('blog-detail', args=[blog()['pk']])),
+            Scenario('blog_detail_by_slug', 'GET', lambda: reverse('blog-detail-by-slug', args=[blog()['slug']])),
+            Scenario('blog_detail_by_title', 'GET', lambda: reverse('blog-detail-by-title', args=[blog()['title']])),
+            Scenario('blog_update', 'PUT', lambda: reverse('blog-detail', args=[blog()['pk']]),
+                     lambda: {"content": words(rng, 60)}, 'admin'),
+            Scenario('blog_delete', 'DELETE', lambda: reverse('blog-detail', args=[doomed.pop()]),
+                     None, 'admin', (204,)),
+            Scenario('comment_list', 'GET', lambda: reverse('comment-list-create', args=[blog()['pk']])),
+            Scenario('comment_list_deep_page', 'GET',
+                     lambda: f"{reverse('comment-list-create', args=[busiest])}?cursor={comment_cursor}"),
+            Scenario('comment_create', 'POST', lambda: reverse('comment-list-create', args=[blog()['pk']]),
+                     lambda: {"content": words(rng, 20)}, 'user', (201,)),
+            Scenario('async_category_list', 'GET', lambda: reverse('async-category-list')),
+            Scenario('async_blog_list', 'GET', lambda: reverse('async-blog-list')),
+            Scenario('async_blog_detail', 'GET', lambda: reverse('async-blog-detail', args=[blog()['pk']])),
+            Scenario('async_comment_list', 'GET', lambda: reverse('async-comment-list', args=[blog()['pk']])),
+            Scenario('password_reset_request', 'POST', lambda: reverse('password-reset-request'),
+                     lambda: {"email": user.email}, None, (200,), 0.2),
+            Scenario('password_reset_confirm', 'POST', lambda: reset_links.pop(),
+                     lambda: {"new_password": PASSWORD}, None, (200,), 0.2),
+            Scenario('metrics', 'GET', lambda: reverse('metrics'), None, None, (200,), 0.1),
+        ]
+
+    def throwaway_blogs(self, author, count):
+        # Targets for the DELETE route, so the seeded dataset stays intact
+        blogs = [Blog(title=f"Delete me {i}", slug=f'{PREFIX}-delete-{self.run_id}-{i}', content="-",
+                      author=author) for i in range(count)]
+        Blog.objects.bulk_create(blogs)
+        return list(Blog.objects.filter(slug__startswith=f'{PREFIX}-delete-{self.run_id}-').values_list('pk', flat=True))
+
+
+def middle_cursor(paginator, rows):
+    count = rows.count()
+    return paginator.cursor_for(rows[count // 2]) if count else ''
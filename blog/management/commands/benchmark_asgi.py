@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from blog.benchmarking import run_async, run_threaded, summarize, write_report
+from blog.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare in-process throughput of the sync (WSGI handler, fixed thread pool) and async "
+        "(ASGI handler, one event loop) read endpoints against the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="User to authenticate as (default: first user).")
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--threads', type=int, default=4, help="WSGI worker threads, like gunicorn --threads.")
+        parser.add_argument('--path', default='/api/blogs/', help="Sync endpoint; the async one is /api/async/...")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        user = users.filter(username=options['username']).first() if options['username'] else users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as; create one first.")
+        headers = {'Authorization': f"Bearer {RefreshToken.for_user(user).access_token}"}
+
+        sync_path = options['path']
+        async_path = sync_path.replace('/api/', '/api/async/', 1)
+        sync_client, async_client = Client(), AsyncClient()
+
+        def call():
+            check(sync_path, sync_client.get(sync_path, headers=headers))
+
+        async def acall():
+            check(async_path, await async_client.get(async_path, headers=headers))
+
+        requests = options['requests']
+        # The test clients send Host: testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            results = [
+                summarize('wsgi', *run_threaded(call, requests, options['threads']),
+                          path=sync_path, concurrency=options['threads']),
+                summarize('asgi', *run_async(acall, requests, options['concurrency']),
+                          path=async_path, concurrency=options['concurrency']),
+            ]
+        write_report(self.stdout, results, options['json'])
+
+
+def check(path, response):
+    if response.status_code != 200:
+        raise CommandError(f"GET {path} returned {response.status_code}: {response.content[:200]!r}")
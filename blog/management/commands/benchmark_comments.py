@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from blog.benchmarking import summarize, write_report
+from blog.models import Blog, Comment, User
+from blog.pagination import CommentCursorPagination
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed one blog with many comments and time comment_list_create at the first, middle and "
+        "last page. With keyset pagination all three should cost the same."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help="Don't delete the benchmark blog afterwards.")
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'email': 'benchmark@example.com'})
+        blog = self.seed(user, options['comments'])
+        try:
+            results = self.measure(user, blog, options)
+        finally:
+            if not options['keep']:
+                Comment.objects.filter(blog=blog).delete()
+                blog.delete()
+        write_report(self.stdout, results, options['json'])
+
+    def seed(self, user, count, batch_size=5000):
+        blog = Blog.objects.create(title="Comment benchmark", content="-", author=user, is_published=True)
+        start = timezone.now() - timezone.timedelta(seconds=count)
+        for offset in range(0, count, batch_size):
+            Comment.objects.bulk_create(
+                Comment(blog=blog, author=user, content=f"Comment {i}",
+                        created_at=start + timezone.timedelta(seconds=i))
+                for i in range(offset, min(offset + batch_size, count))
+            )
+        Blog.objects.filter(pk=blog.pk).update(comment_count=count, last_comment_at=timezone.now())
+        return blog
+
+    def measure(self, user, blog, options):
+        client = Client(headers={'Authorization': f"Bearer {RefreshToken.for_user(user).access_token}"})
+        url = f"/api/blogs/{blog.pk}/comments/"
+        comments = Comment.objects.filter(blog=blog).order_by('created_at', 'id')
+        total = comments.count()
+        paginator = CommentCursorPagination()
+
+        positions = [('first', None)]
+        for name, offset in [('middle', total // 2), ('last', max(total - options['page_size'] - 1, 0))]:
+            row = comments.values('created_at', 'id')[offset]
+            positions.append((name, paginator.cursor_for(row)))
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, cursor in positions:
+                params = {'page_size': options['page_size']}
+                if cursor:
+                    params['cursor'] = cursor
+                latencies = []
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    begin = time.perf_counter()
+                    response = client.get(url, params)
+                    latencies.append(time.perf_counter() - begin)
+                    assert response.status_code == 200, response.content[:200]
+                results.append(summarize(f"comments_{name}_page", latencies, time.perf_counter() - start,
+                                         comments=total, page_size=options['page_size']))
+        return results
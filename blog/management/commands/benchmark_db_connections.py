@@ -0,0 +1,56 @@
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from blog.benchmarking import summarize, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request database overhead for each connection mode. Every iteration runs a "
+        "request cycle (request_started, SELECT 1, request_finished), so Django opens, reuses or "
+        "closes the connection exactly as it would while serving traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        configured = (settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'])
+        modes = [
+            ('close', 0, False),
+            ('persistent', max(configured[0] or 0, 60), True),
+            ('configured', *configured),
+        ]
+        results = []
+        try:
+            for name, max_age, health_checks in modes:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+                connection.close()
+                latencies, elapsed = self.run_cycles(options['requests'])
+                results.append(summarize(
+                    name, latencies, elapsed,
+                    engine=settings_dict['ENGINE'], conn_max_age=max_age, health_checks=health_checks,
+                ))
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = configured
+            connection.close()
+        write_report(self.stdout, results, options['json'])
+
+    def run_cycles(self, requests):
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            begin = time.perf_counter()
+            signals.request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            signals.request_finished.send(sender=self.__class__)
+            latencies.append(time.perf_counter() - begin)
+        return latencies, time.perf_counter() - start
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from blog.benchmarking import summarize, write_report
+from blog.models import Blog, User
+from blog.renderers import FastJSONRenderer, orjson
+from blog.serializers import BlogRowSerializer, BlogSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Time serializing + rendering one feed page with BlogSerializer/JSONRenderer against "
+        "BlogRowSerializer/FastJSONRenderer, and check both produce the same bytes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help="Blogs per page.")
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        seeded = self.seed(options['rows'])
+        try:
+            results = self.measure(options)
+        finally:
+            Blog.all_objects.filter(pk__in=seeded).delete()
+        write_report(self.stdout, results, options['json'])
+
+    def seed(self, rows):
+        # Tops the feed up to `rows` published blogs; returns the ids it created
+        missing = rows - Blog.objects.filter(is_published=True).count()
+        if missing <= 0:
+            return []
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'email': 'benchmark@example.com'})
+        return [
+            Blog.objects.create(title=f"Serializer benchmark {i}", content="Lorem ipsum dolor sit amet " * 40,
+                                author=user, is_published=True).pk
+            for i in range(missing)
+        ]
+
+    def measure(self, options):
+        blogs = (Blog.objects.filter(is_published=True).select_related('author', 'category')
+                 .order_by('-created_at', '-id')[:options['rows']])
+        instances = list(blogs)
+        rows = list(BlogRowSerializer.queryset(blogs))
+
+        paths = [
+            ('drf_serializer', lambda: JSONRenderer().render(BlogSerializer(instances, many=True).data)),
+            ('row_serializer', lambda: FastJSONRenderer().render(BlogRowSerializer(rows).data)),
+        ]
+        outputs = {name: render() for name, render in paths}
+        if len(set(outputs.values())) != 1:
+            raise CommandError("BlogRowSerializer/FastJSONRenderer output differs from BlogSerializer/JSONRenderer")
+
+        results = []
+        for name, render in paths:
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                begin = time.perf_counter()
+                render()
+                latencies.append(time.perf_counter() - begin)
+            results.append(summarize(name, latencies, time.perf_counter() - start, rows=len(rows),
+                                     bytes=len(outputs[name]), orjson=orjson is not None))
+        return results
@@ -0,0 +1,65 @@
+import random
+import time
+import tracemalloc
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from PIL import Image
+
+from blog.benchmarking import summarize, write_report
+from blog.uploads import ImageUploadHandler
+
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Parse one multipart image upload with Django's default upload handlers and with "
+        "ImageUploadHandler, reporting time and peak Python memory (tracemalloc) per upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=float, nargs='+', default=[1, 2, 8], help="Image sizes in MB.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        results = []
+        limit = int(max(options['sizes']) * MB * 2)
+        with override_settings(BLOG_MAX_UPLOAD_SIZE=limit, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for size in options['sizes']:
+                body = encode_multipart(BOUNDARY, {
+                    'title': "Upload benchmark",
+                    'image': SimpleUploadedFile('benchmark.png', noise_png(int(size * MB)), 'image/png'),
+                })
+                for name, streaming in [('default_handlers', False), ('image_upload_handler', True)]:
+                    results.append(self.measure(f'{name}_{size:g}mb', body, streaming, options['repeat'], size))
+        write_report(self.stdout, results, options['json'])
+
+    def measure(self, name, body, streaming, repeat, size):
+        latencies, peaks = [], []
+        for _ in range(repeat):
+            request = RequestFactory().generic('POST', '/', body, content_type=MULTIPART_CONTENT)
+            if streaming:
+                request.upload_handlers = [ImageUploadHandler(request)]
+            tracemalloc.start()
+            begin = time.perf_counter()
+            upload = request.FILES['image']
+            latencies.append(time.perf_counter() - begin)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            upload.close()
+        return summarize(name, latencies, sum(latencies), size_mb=size, peak_kb=round(max(peaks) / 1024))
+
+
+def noise_png(size):
+    # Random pixels don't compress, so the PNG is about `size` bytes
+    side = max(1, int((size / 3) ** 0.5))
+    pixels = random.Random(size).randbytes(side * side * 3)
+    buffer = BytesIO()
+    Image.frombytes('RGB', (side, side), pixels).save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue()
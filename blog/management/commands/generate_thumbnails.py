@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.thumbnails import generate_pending
+
+
+class Command(BaseCommand):
+    help = "Make resized WebP/JPEG variants of new blog images and profile pictures. Use --loop to run as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=10.0)
+        parser.add_argument('--batch-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            generated, failed = generate_pending(options['batch_size'])
+            if generated or failed:
+                self.stdout.write(f"generated={generated} failed={failed}")
+            if not options['loop']:
+                break
+            if generated + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.blacklist import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding/blacklisted refresh tokens in batches "
+        "(a batched flushexpiredtokens). Use --loop to run as a scheduled worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tokens per DELETE statement.")
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float, default=3600.0)
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            deleted = prune_expired_tokens(options['batch_size'])
+            if deleted or options['verbosity'] > 1:
+                self.stdout.write(f"pruned_rows={deleted}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
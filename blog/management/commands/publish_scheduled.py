@@ -0,0 +1,46 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.metrics import registry
+from blog.publishing import publish_due_blogs
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    # Prometheus text for this process: the scheduler's counters aren't in the web workers' registry
+    def do_GET(self):
+        body = registry.exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Publish blogs whose publish_at has passed. Use --loop to keep running as a scheduler."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, one tick every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=30.0)
+        parser.add_argument('--metrics-port', type=int,
+                            help="Serve batch size/lag metrics (Prometheus text) on this port.")
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            server = ThreadingHTTPServer(('', options['metrics_port']), MetricsHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        while True:
+            close_old_connections()
+            result = publish_due_blogs()
+            if result.batch or options['verbosity'] > 1:
+                self.stdout.write(f"published={result.batch} lag_seconds={result.lag:.1f}")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
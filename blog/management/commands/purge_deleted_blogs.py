@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.purge import purge_deleted_blogs
+
+
+class Command(BaseCommand):
+    help = "Hard-delete blogs that were soft-deleted more than --days ago, with their comments, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=30.0, help="Grace period before a deleted blog is purged.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per DELETE statement.")
+        parser.add_argument('--limit', type=int, default=100, help="Blogs purged per run/tick.")
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float, default=300.0)
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            cutoff = timezone.now() - timezone.timedelta(days=options['days'])
+            blogs, comments = purge_deleted_blogs(cutoff, options['batch_size'], options['limit'])
+            if blogs or options['verbosity'] > 1:
+                self.stdout.write(f"purged_blogs={blogs} purged_comments={comments}")
+            if not options['loop']:
+                break
+            if blogs < options['limit']:
+                time.sleep(options['interval'])
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog import caching
+from blog.models import Blog, Comment, latest_comment_subquery
+
+
+class Command(BaseCommand):
+    help = "Recompute Blog.comment_count and Blog.last_comment_at from the comments table, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        visible_count = Subquery(
+            Comment.objects.filter(blog=OuterRef('pk'), deleted_at__isnull=True)
+            .order_by()
+            .values('blog')
+            .annotate(n=Count('id'))
+            .values('n'),
+            output_field=IntegerField(),
+        )
+        last_pk = 0
+        updated = 0
+        while True:
+            ids = list(
+                Blog.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            # One UPDATE per batch keeps each transaction (and its locks) short
+            updated += Blog.objects.filter(pk__in=ids).update(
+                comment_count=Coalesce(visible_count, 0),
+                last_comment_at=latest_comment_subquery(),
+            )
+            last_pk = ids[-1]
+        caching.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt comment counters for {updated} blogs."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from blog import search
+from blog.models import Blog
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted search index (SearchTerm) for all blogs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if search.get_backend() != search.INVERTED:
+            self.stdout.write("Search backend is FULLTEXT; the database maintains the index itself.")
+            return
+        indexed = search.rebuild_index(Blog.objects.order_by('pk'), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} blogs."))
@@ -0,0 +1,40 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import PASSWORD, is_seeded, seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, categories, blogs and comments using batched "
+        "bulk_create and one shared password hash. The same --seed and --end give the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--blogs', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help="Usernames are <prefix>-<n>, plus <prefix>-admin.")
+        parser.add_argument('--end', type=datetime.fromisoformat,
+                            help="Newest timestamp (ISO 8601, UTC if naive). Default: start of today, UTC.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--password', default=PASSWORD, help="Password of every seeded user.")
+
+    def handle(self, *args, **options):
+        if is_seeded(options['prefix']):
+            raise CommandError(f"Already seeded: user {options['prefix']}-admin exists. Use another --prefix.")
+        end = options['end']
+        if end is not None and end.tzinfo is None:
+            end = end.replace(tzinfo=dt_timezone.utc)
+        start = time.perf_counter()
+        created = seed_data(
+            users=options['users'], categories=options['categories'], blogs=options['blogs'],
+            comments=options['comments'], seed=options['seed'], prefix=options['prefix'], end=end,
+            password=options['password'], batch_size=options['batch_size'], progress=self.stderr.write,
+        )
+        counts = ' '.join(f'{name}={count}' for name, count in created.items())
+        self.stdout.write(f"{counts} in {time.perf_counter() - start:.1f}s")
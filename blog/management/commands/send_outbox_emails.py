@@ -0,0 +1,40 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails over a single mail connection. Use --loop to run as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, polling every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=5.0)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        try:
+            while True:
+                close_old_connections()
+                try:
+                    sent, failed = send_pending(options['batch_size'], connection=connection)
+                except Exception as e:
+                    # Mail server unreachable: claimed rows are retried once their lease expires
+                    self.stderr.write(f"outbox error: {e}")
+                    connection.close()
+                    sent = failed = 0
+                if sent or failed:
+                    self.stdout.write(f"sent={sent} failed={failed}")
+                if not options['loop']:
+                    break
+                if sent == options['batch_size']:
+                    continue  # more waiting, keep the connection busy
+                # Idle: don't hold the SMTP session open between polls
+                connection.close()
+                time.sleep(options['interval'])
+        finally:
+            connection.close()
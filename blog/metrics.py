@@ -0,0 +1,260 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+# Per-request timings (DB queries, serialization, rendering) aggregated per endpoint,
+# exposed as Prometheus text at /api/metrics/ and per response as a Server-Timing
+# header. Off unless BLOG_METRICS_ENABLED: the middleware then removes itself
+# (MiddlewareNotUsed) and the query/serializer/renderer hooks cost one ContextVar lookup.
+# Aggregates are per process; scrape every worker or run a single one. Throttle
+# decisions (blog.throttling) and scheduled publishing ticks (blog.publishing) are
+# counted here too, whether or not this is enabled; `publish_scheduled --metrics-port`
+# serves the scheduler process's copy.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+PHASES = ('db', 'serialize', 'render')
+
+_current = ContextVar('blog_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.active = set()
+
+
+@contextmanager
+def timed(phase):
+    # Adds the block's duration to the current request; nested blocks of the same phase count once
+    metrics = _current.get()
+    if metrics is None or phase in metrics.active:
+        yield
+        return
+    metrics.active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.seconds[phase] += time.perf_counter() - start
+        metrics.active.discard(phase)
+
+
+class TimedSerializerMixin:
+    # DRF hook: time spent in to_representation(), outermost call only
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or 'serialize' in metrics.active:
+            return super().to_representation(instance)
+        with timed('serialize'):
+            return super().to_representation(instance)
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.seconds['db'] += time.perf_counter() - start
+
+
+def install_query_hook():
+    # Called from BlogConfig.ready() so every connection, in every thread, gets the
+    # wrapper; sync_to_async threads see the request through the copied context.
+    # Outside a measured request it costs one ContextVar lookup per query.
+    connection_created.connect(_add_query_wrapper, dispatch_uid='blog.metrics.record_query')
+    for connection in connections.all(initialized_only=True):
+        _add_query_wrapper(None, connection)
+
+
+def _add_query_wrapper(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class EndpointStats:
+    def __init__(self):
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.queries = 0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._throttles = {}
+        self._publishing = dict.fromkeys(('ticks', 'published', 'batch', 'lag'), 0)
+
+    def observe(self, labels, duration, size, metrics):
+        with self._lock:
+            stats = self._endpoints.get(labels)
+            if stats is None:
+                stats = self._endpoints[labels] = EndpointStats()
+            stats.duration.observe(duration)
+            if size is not None:
+                stats.size.observe(size)
+            stats.queries += metrics.queries
+            for phase, seconds in metrics.seconds.items():
+                stats.seconds[phase] += seconds
+
+    def count_throttle(self, scope, allowed):
+        key = (scope, 'allowed' if allowed else 'throttled')
+        with self._lock:
+            self._throttles[key] = self._throttles.get(key, 0) + 1
+
+    def observe_publish(self, batch, lag):
+        with self._lock:
+            self._publishing['ticks'] += 1
+            self._publishing['published'] += batch
+            self._publishing['batch'] = batch
+            self._publishing['lag'] = lag
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._throttles.clear()
+            self._publishing.update(dict.fromkeys(self._publishing, 0))
+
+    def exposition(self):
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+            _histogram(lines, 'blog_request_duration_seconds', "Request latency by endpoint.",
+                       [(labels, stats.duration) for labels, stats in endpoints])
+            _histogram(lines, 'blog_response_size_bytes', "Response body size by endpoint (non-streaming).",
+                       [(labels, stats.size) for labels, stats in endpoints])
+            _counter(lines, 'blog_db_queries_total', "Database queries run by endpoint.",
+                     [(labels, stats.queries) for labels, stats in endpoints])
+            for phase in PHASES:
+                _counter(lines, f'blog_{phase}_seconds_total', f"Time spent in {phase} by endpoint.",
+                         [(labels, stats.seconds[phase]) for labels, stats in endpoints])
+            lines += ['# HELP blog_throttle_decisions_total Throttle checks by scope and outcome.',
+                      '# TYPE blog_throttle_decisions_total counter']
+            lines += [f'blog_throttle_decisions_total{{scope="{scope}",outcome="{outcome}"}} {count}'
+                      for (scope, outcome), count in sorted(self._throttles.items())]
+            publishing = self._publishing
+            _single(lines, 'blog_publish_ticks_total', 'counter', "Scheduled publishing runs.", publishing['ticks'])
+            _single(lines, 'blog_published_total', 'counter', "Blogs published by the scheduler.",
+                    publishing['published'])
+            _single(lines, 'blog_publish_batch', 'gauge', "Blogs published by the last run.", publishing['batch'])
+            _single(lines, 'blog_publish_lag_seconds', 'gauge',
+                    "Delay of the oldest blog published by the last run.", publishing['lag'])
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    endpoint, method, status = labels
+    pairs = {'endpoint': endpoint, 'method': method, 'status': status, **extra}
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in pairs.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(pairs, escaped)) + '}'
+
+
+def _histogram(lines, name, help_text, series):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, histogram in series:
+        cumulative = 0
+        for bound, count in zip([*histogram.buckets, '+Inf'], histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(labels, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(labels)} {histogram.sum}')
+        lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+
+def _counter(lines, name, help_text, series):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+    lines += [f'{name}{_labels(labels)} {value}' for labels, value in series]
+
+
+def _single(lines, name, kind, help_text, value):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}', f'{name} {value}']
+
+
+registry = Registry()
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.BLOG_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def finish(self, request, response, metrics, duration):
+        # Streaming bodies are produced after this returns: no size, and their queries aren't counted
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name or match._func_path) if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.observe((endpoint, request.method, response.status_code), duration, size, metrics)
+        response['Server-Timing'] = server_timing(metrics, duration)
+        return response
+
+
+def server_timing(metrics, duration):
+    parts = [f'db;dur={metrics.seconds["db"] * 1000:.1f};desc="{metrics.queries} queries"']
+    parts += [f'{phase};dur={metrics.seconds[phase] * 1000:.1f}' for phase in ('serialize', 'render')]
+    parts.append(f'total;dur={duration * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def metrics_view(request):
+    # Prometheus scrape endpoint; set BLOG_METRICS_TOKEN to require "Authorization: Bearer <token>"
+    if not settings.BLOG_METRICS_ENABLED:
+        raise Http404
+    token = settings.BLOG_METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.exposition(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_blog_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='slug',
+            field=models.SlugField(db_index=False, max_length=120, null=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, transaction
+from django.utils.text import slugify
+
+BATCH_SIZE = 500
+
+
+# Frozen copy of blog.slugs.slug_base, so later changes there don't change this migration
+def slug_base(title):
+    return slugify(title)[:100].strip('-') or 'blog'
+
+
+# Backfill in short transactions (the migration itself is non-atomic) so no lock
+# is held on blog_blog for longer than one batch.
+def backfill_slugs(apps, schema_editor):
+    Blog = apps.get_model('blog', 'Blog')
+    while True:
+        with transaction.atomic():
+            blogs = list(Blog.objects.filter(slug__isnull=True).order_by('pk').only('pk', 'title')[:BATCH_SIZE])
+            if not blogs:
+                return
+            bases = {blog.pk: slug_base(blog.title) for blog in blogs}
+            taken = set(Blog.objects.filter(slug__in=set(bases.values())).values_list('slug', flat=True))
+            for blog in blogs:
+                # Oldest blog keeps the plain slug; later duplicates get their id appended,
+                # plus -<n> if another title already produced that slug
+                slug = bases[blog.pk]
+                if slug in taken:
+                    candidate, n = f'{slug}-{blog.pk}', 1
+                    while candidate in taken or Blog.objects.filter(slug=candidate).exists():
+                        n += 1
+                        candidate = f'{slug}-{blog.pk}-{n}'
+                    slug = candidate
+                blog.slug = slug
+                taken.add(slug)
+            Blog.objects.bulk_update(blogs, ['slug'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('blog', '0009_blog_slug'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_slugs, migrations.RunPython.noop),
+    ]
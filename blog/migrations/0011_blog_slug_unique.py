@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_backfill_blog_slugs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blog',
+            name='slug',
+            field=models.SlugField(max_length=120, unique=True),
+        ),
+    ]
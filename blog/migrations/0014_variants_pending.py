@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:15
+
+from django.db import migrations, models
+
+
+# Rows uploaded before the flag existed and still waiting for the worker (one scan, here
+# instead of on every poll)
+def flag_pending(apps, schema_editor):
+    for model, field, attr in [('Blog', 'image', 'image_variants'), ('User', 'profile_picture', 'profile_picture_variants')]:
+        (apps.get_model('blog', model)._base_manager.filter(**{attr: {}})
+         .exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+         .update(**{f'{attr}_pending': True}))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_blog_title_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='image_variants_pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_variants_pending',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.RunPython(flag_pending, migrations.RunPython.noop),
+    ]
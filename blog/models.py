@@ -1,13 +1,34 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
+from .slugs import slug_base, unique_slug
 
 # Create your models here.
+def reset_stale_variants(field_file, instance, attr):
+    # Variants record the file they were made from; a new upload (or removal)
+    # empties them, and a file without variants sets the indexed <attr>_pending flag
+    # that the generate_thumbnails worker polls
+    variants = getattr(instance, attr)
+    source = field_file.name or None
+    if variants and variants.get('source') != source:
+        variants = {}
+        setattr(instance, attr, variants)
+    setattr(instance, f'{attr}_pending', bool(source) and variants.get('source') != source)
+
+
 # User model
 class User(AbstractUser):
     is_admin=models.BooleanField(default=False)
     profile_picture=models.ImageField(upload_to="profile_pics/",blank=True, null=True )
+    # Resized copies of profile_picture, written by the generate_thumbnails worker
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
+    profile_picture_variants_pending = models.BooleanField(default=False, db_index=True)
     email=models.EmailField(unique=True)
+
+    def save(self, *args, **kwargs):
+        reset_stale_variants(self.profile_picture, self, 'profile_picture_variants')
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return self.username
@@ -22,10 +43,23 @@ class Category(models.Model):
         return self.name
     
 # Blog model
+SLUG_ATTEMPTS = 3
+
+
+class BlogManager(models.Manager):
+    # Soft-deleted blogs are hidden everywhere; use Blog.all_objects to see them
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Blog(models.Model):
     title=models.CharField(max_length=100)
+    slug = models.SlugField(max_length=120, unique=True)
     content=models.TextField()
     image=models.ImageField(upload_to='blog_image/', blank=True ,null=True)
+    # Resized copies of image, written by the generate_thumbnails worker
+    image_variants = models.JSONField(default=dict, blank=True)
+    image_variants_pending = models.BooleanField(default=False, db_index=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='blogs')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='blogs')
     created_at = models.DateTimeField(default=timezone.now)
@@ -33,32 +67,116 @@ class Blog(models.Model):
     is_published = models.BooleanField(default=False)
     publish_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
-    
-    
-    
+    # Denormalized from Comment, maintained by Comment.save()/soft_delete()
+    comment_count = models.PositiveIntegerField(default=0)
+    last_comment_at = models.DateTimeField(null=True, blank=True)
+
+    objects = BlogManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the published, not deleted feed: (created_at, id) range scans
+            models.Index(fields=['is_published', 'deleted_at', 'created_at', 'id'], name='blog_feed_idx'),
+            # Scheduled publishing: unpublished posts with publish_at <= now
+            models.Index(fields=['is_published', 'publish_at'], name='blog_schedule_idx'),
+            # GET /api/blogs/title/<title>/
+            models.Index(fields=['title'], name='blog_title_idx'),
+        ]
+
+    def soft_delete(self):
+        # Comments stay until purge_deleted_blogs removes them off the request path. Image
+        # files are kept even then: uploads are deduplicated by content hash (blog.uploads),
+        # so another blog or profile may point at the same file and variants
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at', 'updated_at'])
+
     def save(self, *args, **kwargs):
         if self.publish_at and self.publish_at <= timezone.now():
             self.is_published = True
-        super().save(*args, **kwargs)
+        reset_stale_variants(self.image, self, 'image_variants')
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        # Slug is generated once and kept when the title changes; a concurrent
+        # insert can take the same slug, so retry with a fresh one
+        for attempt in range(SLUG_ATTEMPTS):
+            self.slug = unique_slug(Blog.all_objects, slug_base(self.title))
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS - 1:
+                    raise
         
     def __str__(self):
         return self.title
   
   
 # Comment model  
+def latest_comment_subquery():
+    # Newest visible comment of the blog being updated (use inside Blog.objects.update)
+    return Subquery(
+        Comment.objects.filter(blog=OuterRef('pk'), deleted_at__isnull=True)
+        .order_by('-created_at')
+        .values('created_at')[:1]
+    )
+
+
 class Comment(models.Model):
         blog = models.ForeignKey(Blog,on_delete=models.CASCADE, related_name='comments')
         author = models.ForeignKey(User,on_delete=models.CASCADE, related_name='comments')
         content = models.TextField()
         created_at = models.DateTimeField(default=timezone.now)
         deleted_at = models.DateTimeField(null=True, blank=True)
-        
+
+        class Meta:
+            indexes = [
+                # Visible comments of a blog in (created_at, id) order: `deleted_at IS NULL`
+                # is an equality match, so pages are a single range scan
+                models.Index(fields=['blog', 'deleted_at', 'created_at', 'id'], name='comment_page_idx'),
+            ]
+
+        def save(self, *args, **kwargs):
+            adding = self._state.adding
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if adding and self.deleted_at is None:
+                    newer = Q(last_comment_at__isnull=True) | Q(last_comment_at__lt=self.created_at)
+                    Blog.all_objects.filter(pk=self.blog_id).update(
+                        comment_count=F('comment_count') + 1,
+                        last_comment_at=Case(When(newer, then=Value(self.created_at)), default=F('last_comment_at')),
+                    )
+
         def soft_delete(self):
-            self.deleted_at = timezone.now()
-            self.save()
+            if self.deleted_at is not None:
+                return
+            with transaction.atomic():
+                self.deleted_at = timezone.now()
+                self.save()
+                Blog.all_objects.filter(pk=self.blog_id).update(
+                    comment_count=Case(When(comment_count__gt=0, then=F('comment_count') - 1), default=Value(0)),
+                    last_comment_at=latest_comment_subquery(),
+                )
     
         def __str__(self):
             return f"{self.author.username} on '{self.blog.title}': {self.content[:50]}"
+
+
+# Inverted index used for search when the database has no FULLTEXT support (e.g. SQLite)
+class SearchTerm(models.Model):
+    term = models.CharField(max_length=64)
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'blog'], name='searchterm_term_blog_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.blog_id} ({self.weight})"
         
 
         
@@ -71,3 +189,30 @@ class Comment(models.Model):
     
     
     
+
+
+# Outgoing email queue, drained by the send_outbox_emails command
+class OutboxEmail(models.Model):
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
@@ -0,0 +1,87 @@
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Requests only insert a row; the send_outbox_emails worker delivers them in
+# batches over one SMTP connection, retrying with exponential backoff.
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+# Claimed rows are hidden from other workers for this long while being sent
+LEASE_SECONDS = 5 * 60
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=list(recipient_list),
+    )
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(batch_size, now):
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=ids).update(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+    return list(OutboxEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def send_pending(batch_size=100, connection=None):
+    # Sends one batch of due emails; returns (sent, failed) counts
+    now = timezone.now()
+    emails = claim_batch(batch_size, now)
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection()
+    sent_ids = []
+    failed = 0
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=email.from_email,
+                to=email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                failed += 1
+                mark_failed(email, e, now)
+            else:
+                sent_ids.append(email.id)
+    finally:
+        OutboxEmail.objects.filter(id__in=sent_ids).update(status=OutboxEmail.SENT, sent_at=timezone.now())
+    return len(sent_ids), failed
+
+
+def mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+        logger.error("Giving up on outbox email %s after %d attempts: %s", email.id, email.attempts, error)
+    else:
+        email.next_attempt_at = now + backoff(email.attempts)
+        logger.warning("Outbox email %s failed (attempt %d): %s", email.id, email.attempts, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
@@ -0,0 +1,36 @@
+import logging
+from collections import namedtuple
+
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Blog
+from . import caching
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# batch: number of blogs published in this tick
+# lag: seconds between the oldest publish_at in the batch and the tick
+# Both are exported through blog.metrics (blog_publish_batch, blog_publish_lag_seconds)
+PublishResult = namedtuple('PublishResult', ['batch', 'lag'])
+
+
+def publish_due_blogs(now=None):
+    # Publishes every due post with a single UPDATE, using blog_schedule_idx
+    now = now or timezone.now()
+    due = Blog.objects.filter(is_published=False, publish_at__lte=now)
+    oldest = due.aggregate(oldest=Min('publish_at'))['oldest']
+    if oldest is None:
+        registry.observe_publish(0, 0.0)
+        return PublishResult(batch=0, lag=0.0)
+
+    # updated_at too: it drives the detail ETag/Last-Modified (blog.conditional)
+    batch = due.update(is_published=True, updated_at=now)
+    lag = (now - oldest).total_seconds()
+    if batch:
+        # update() skips post_save, so invalidate cached feed pages here
+        caching.invalidate()
+    logger.info("Published %d scheduled blogs (lag %.1fs)", batch, lag)
+    registry.observe_publish(batch, lag)
+    return PublishResult(batch=batch, lag=lag)
@@ -0,0 +1,32 @@
+import logging
+
+from django.db import transaction
+
+from .models import Blog, Comment, SearchTerm
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size):
+    # Short DELETE ... WHERE id IN (...) statements instead of one long cascade
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += queryset.model._base_manager.filter(pk__in=ids).delete()[0]
+
+
+def purge_deleted_blogs(cutoff, batch_size=1000, limit=None):
+    # Hard-deletes blogs soft-deleted before `cutoff`, dependents first, in bounded batches
+    blogs = comments = 0
+    candidates = Blog.all_objects.filter(deleted_at__lte=cutoff).order_by('deleted_at', 'pk')
+    for blog_id in candidates.values_list('pk', flat=True)[:limit]:
+        comments += delete_in_batches(Comment.objects.filter(blog_id=blog_id), batch_size)
+        delete_in_batches(SearchTerm.objects.filter(blog_id=blog_id), batch_size)
+        with transaction.atomic():
+            Blog.all_objects.filter(pk=blog_id).delete()
+        blogs += 1
+    if blogs:
+        logger.info("Purged %d deleted blogs and %d comments", blogs, comments)
+    return blogs, comments
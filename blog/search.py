@@ -0,0 +1,107 @@
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.expressions import RawSQL
+
+from .models import SearchTerm
+
+# Full-text search over Blog.title/content.
+# - "fulltext": MySQL FULLTEXT index (see migration 0003), ranked by MATCH ... AGAINST
+# - "inverted": SearchTerm rows maintained on Blog save, ranked by summed term weights
+
+FULLTEXT = 'fulltext'
+INVERTED = 'inverted'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TOKENS = 10
+TITLE_WEIGHT = 3
+
+
+def get_backend():
+    backend = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if backend:
+        return backend
+    return FULLTEXT if connection.vendor == 'mysql' else INVERTED
+
+
+def tokenize(text):
+    return [
+        token[:MAX_TOKEN_LENGTH]
+        for token in TOKEN_RE.findall((text or '').lower())
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def term_weights(blog):
+    weights = Counter(tokenize(blog.content))
+    for token in tokenize(blog.title):
+        weights[token] += TITLE_WEIGHT
+    return weights
+
+
+def search_blogs(queryset, query):
+    # Returns the queryset filtered to matching blogs and annotated with `search_rank`
+    if get_backend() == FULLTEXT:
+        table = queryset.model._meta.db_table
+        rank = RawSQL(
+            f"MATCH({table}.title, {table}.content) AGAINST (%s IN NATURAL LANGUAGE MODE)",
+            (query,),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank).filter(search_rank__gt=0)
+
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens:
+        # Still annotated: BlogSearchPagination orders by search_rank
+        return queryset.annotate(search_rank=Value(0, IntegerField())).none()
+    # Narrow to blogs having one of the terms first (term index), then rank only those
+    candidates = SearchTerm.objects.filter(term__in=tokens).values('blog_id')
+    matches = (
+        SearchTerm.objects.filter(blog=OuterRef('pk'), term__in=tokens)
+        .order_by()
+        .values('blog')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    rank = Subquery(matches, output_field=IntegerField())
+    return queryset.filter(pk__in=candidates).annotate(search_rank=rank)
+
+def index_blog(blog):
+    if get_backend() != INVERTED:
+        return
+    with transaction.atomic():
+        SearchTerm.objects.filter(blog=blog).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, blog=blog, weight=weight)
+            for term, weight in term_weights(blog).items()
+        )
+
+
+def rebuild_index(blogs, batch_size=500):
+    # Bulk rebuild for existing rows: one delete + one insert per batch of blogs
+    indexed = 0
+    batch = []
+    for blog in blogs.only('id', 'title', 'content').iterator(chunk_size=batch_size):
+        batch.append(blog)
+        if len(batch) >= batch_size:
+            indexed += _index_batch(batch)
+            batch = []
+    if batch:
+        indexed += _index_batch(batch)
+    return indexed
+
+
+def _index_batch(blogs):
+    with transaction.atomic():
+        SearchTerm.objects.filter(blog__in=[blog.pk for blog in blogs]).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term, blog_id=blog.pk, weight=weight)
+            for blog in blogs
+            for term, weight in term_weights(blog).items()
+        )
+    return len(blogs)
@@ -0,0 +1,123 @@
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from . import caching
+from .bulk import fill_pks
+from .category_cache import invalidate_categories
+from .models import Blog, Category, Comment, SearchTerm, User
+from .search import INVERTED, get_backend, term_weights
+from .slugs import slug_base
+
+# Synthetic data at production scale, written with batched bulk_create: no per-row
+# save() logic, one password hash shared by every user, and the denormalized
+# columns (slug, comment counters, search terms) filled in directly. The same seed
+# and end date always produce the same rows.
+
+PASSWORD = 'seed-Passw0rd!'
+WORDS = (
+    "python django database index query cache latency throughput cursor page search token thread "
+    "async worker queue image upload comment category author title content server client request "
+    "response header stream batch bulk export import metric histogram profile memory storage backup "
+    "replica shard lock transaction commit rollback migration schema column table row join filter "
+    "order limit offset count sum average median percentile benchmark seed fixture deploy release"
+).split()
+# Blogs are spread over this window before `end`
+SPAN = timedelta(days=365)
+
+
+def words(rng, count):
+    return ' '.join(rng.choices(WORDS, k=count))
+
+
+def default_end():
+    # Start of the current UTC day, so runs on the same day match without passing `end`
+    return datetime.now(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def is_seeded(prefix):
+    return User.objects.filter(username=f'{prefix}-admin').exists()
+
+
+def seed_data(users=1000, categories=50, blogs=100_000, comments=1_000_000, seed=42, prefix='seed',
+              end=None, password=PASSWORD, batch_size=5000, progress=None):
+    # Returns the number of rows created per model; `progress` gets one line per batch
+    rng = random.Random(seed)
+    end = end or default_end()
+    report = progress or (lambda message: None)
+
+    user_ids = seed_users(users, prefix, make_password(password), batch_size)
+    report(f"users {len(user_ids)}")
+    Category.objects.bulk_create(
+        [Category(name=f'{prefix} {i}', description=words(rng, 8)) for i in range(categories)],
+        ignore_conflicts=True,
+    )
+    category_ids = list(Category.objects.filter(name__startswith=f'{prefix} ').values_list('pk', flat=True))
+    report(f"categories {len(category_ids)}")
+
+    # Comments per blog are drawn up front (skewed towards a few popular blogs), so the
+    # counters are written with the blogs instead of in an UPDATE pass
+    counts = [0] * blogs
+    for _ in range(comments):
+        counts[int(blogs * rng.random() ** 3)] += 1
+
+    index = get_backend() == INVERTED
+    created = {'users': len(user_ids), 'categories': len(category_ids), 'blogs': 0, 'comments': 0}
+    for offset in range(0, blogs, batch_size):
+        batch = [
+            make_blog(rng, prefix, i, counts[i], end, user_ids, category_ids)
+            for i in range(offset, min(offset + batch_size, blogs))
+        ]
+        with transaction.atomic():
+            Blog.all_objects.bulk_create(batch)
+            fill_pks(batch)
+            Comment.objects.bulk_create(
+                (Comment(blog_id=blog.pk, author_id=rng.choice(user_ids), content=words(rng, 20),
+                         created_at=comment_time(blog.created_at, end, blog.comment_count, j))
+                 for blog in batch for j in range(blog.comment_count)),
+                batch_size=batch_size,
+            )
+            if index:
+                SearchTerm.objects.bulk_create(
+                    (SearchTerm(term=term, blog_id=blog.pk, weight=weight)
+                     for blog in batch for term, weight in term_weights(blog).items()),
+                    batch_size=batch_size,
+                )
+        created['blogs'] += len(batch)
+        created['comments'] += sum(blog.comment_count for blog in batch)
+        report(f"blogs {created['blogs']}/{blogs} comments {created['comments']}/{comments}")
+
+    caching.invalidate()
+    invalidate_categories()
+    return created
+
+
+def seed_users(count, prefix, password_hash, batch_size):
+    admin = User(username=f'{prefix}-admin', email=f'{prefix}-admin@example.com', password=password_hash,
+                 is_admin=True)
+    for offset in range(0, count + 1, batch_size):
+        batch = [admin] if offset == 0 else []
+        batch += [User(username=f'{prefix}-{i}', email=f'{prefix}-{i}@example.com', password=password_hash)
+                  for i in range(offset, min(offset + batch_size, count))]
+        User.objects.bulk_create(batch)
+    return list(User.objects.filter(username__startswith=f'{prefix}-').order_by('pk').values_list('pk', flat=True))
+
+
+def make_blog(rng, prefix, i, comment_count, end, user_ids, category_ids):
+    created_at = end - SPAN * rng.random()
+    title = words(rng, 6)[:100]
+    return Blog(
+        # Same shape as Blog.save() slugs (title-based), unique through the row number
+        title=title, slug=f'{slug_base(title)}-{prefix}-{i}', content=words(rng, 60),
+        author_id=rng.choice(user_ids), category_id=rng.choice(category_ids),
+        created_at=created_at, is_published=rng.random() < 0.95,
+        comment_count=comment_count,
+        last_comment_at=comment_time(created_at, end, comment_count, comment_count - 1) if comment_count else None,
+    )
+
+
+def comment_time(created_at, end, count, index):
+    # A blog's comments are spread evenly between its creation and `end`
+    return created_at + (end - created_at) * (index + 1) / (count + 1)
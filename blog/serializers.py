@@ -1,21 +1,35 @@
+from operator import itemgetter
 from rest_framework import serializers
+from django.conf import settings
+from django.db.models.functions import Substr
+from django.utils import timezone
 from .models import User,Category,Blog,Comment
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
 from django.contrib.auth import password_validation
+from .category_cache import categories
+from .thumbnails import variant_urls
+from .uploads import deduplicate
+from .metrics import TimedSerializerMixin, timed
+from .blacklist import RefreshToken
 
 
-class UserSerailizer(serializers.ModelSerializer):
+class UserSerailizer(TimedSerializerMixin, serializers.ModelSerializer):
+    profile_picture_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['id', 'username', 'is_admin','profile_picture' ,'email']
+        fields = ['id', 'username', 'is_admin','profile_picture' ,'profile_picture_variants','email']
         read_only_fields = ['is_admin']
+
+    def get_profile_picture_variants(self, user):
+        return variant_urls(User._meta.get_field('profile_picture').storage, user.profile_picture_variants)
         
         
         
         
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description']
@@ -24,7 +38,7 @@ class CategorySerializer(serializers.ModelSerializer):
    
    
         
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author =UserSerailizer(read_only=True)  
     class Meta:
         model = Comment
@@ -34,35 +48,45 @@ class CommentSerializer(serializers.ModelSerializer):
 
 
         
-class BlogSerializer(serializers.ModelSerializer):
+class BlogSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     author = UserSerailizer(read_only=True) 
     category = CategorySerializer(read_only=True)
     category_name = serializers.CharField(write_only=True)
+    image_variants = serializers.SerializerMethodField()
     class Meta:
         model = Blog
         fields = [
-            'id','title','content','image','author','category','category_name','created_at','updated_at',
-            'is_published','publish_at','deleted_at', ]
-        read_only_fields = ['author', 'created_at', 'updated_at', 'deleted_at', 'is_published']
+            'id','title','slug','content','image','image_variants','author','category','category_name','created_at','updated_at',
+            'is_published','publish_at','deleted_at','comment_count','last_comment_at', ]
+        read_only_fields = ['slug', 'author', 'created_at', 'updated_at', 'deleted_at', 'is_published',
+                            'comment_count', 'last_comment_at']
+
+    def get_image_variants(self, blog):
+        return variant_urls(Blog._meta.get_field('image').storage, blog.image_variants)
+
+    def validate_image(self, value):
+        return deduplicate(value, Blog._meta.get_field('image'))
         
         
     def create(self, validated_data):
         category_name = validated_data.pop('category_name')
         # Category ko fetch karo ya create karo
-        category, _ = Category.objects.get_or_create(name=category_name)
+        category, _ = categories.get_or_create(category_name)
         # Author set karo
         
-        author = validated_data.pop('author', None)
-        if not author and self.context.get('request'):
-            author = self.context['request'].user
-        blog = Blog.objects.create(**validated_data, author=author, category=category)
+        if 'author_id' not in validated_data:
+            author = validated_data.pop('author', None)
+            if not author and self.context.get('request'):
+                author = self.context['request'].user
+            validated_data['author'] = author
+        blog = Blog.objects.create(**validated_data, category=category)
         return blog
     
     def update(self, instance, validated_data):
         # Agar category_name present ho toh update karo
         category_name = validated_data.pop('category_name', None)
         if category_name:
-            category, _ = Category.objects.get_or_create(name=category_name)
+            category, _ = categories.get_or_create(category_name)
             instance.category = category
         
         # Baaki fields update karo
@@ -76,6 +100,115 @@ class BlogSerializer(serializers.ModelSerializer):
 
 
 
+# Read-only fast path for blog lists: plain dicts built from .values() rows, without
+# per-field serializer machinery. With the default fields it produces exactly what
+# BlogSerializer(..., many=True).data does for the same rows (no request in context,
+# so file URLs stay relative). `fields` picks a subset of the top-level fields, and
+# only their columns are selected; `excerpt` is the first excerpt_length characters
+# of content, cut by the database so the full text is never read into Python.
+class BlogRowSerializer:
+    default_fields = (
+        'id', 'title', 'slug', 'content', 'image', 'image_variants', 'author', 'category', 'created_at', 'updated_at',
+        'is_published', 'publish_at', 'deleted_at', 'comment_count', 'last_comment_at',
+    )
+    field_columns = {
+        **{name: (name,) for name in default_fields},
+        'author': ('author_id', 'author__username', 'author__is_admin', 'author__profile_picture',
+                   'author__profile_picture_variants', 'author__email'),
+        'category': ('category_id', 'category__name', 'category__description'),
+        'excerpt': ('excerpt',),
+    }
+    excerpt_length = 200
+    image_storage = Blog._meta.get_field('image').storage
+    picture_storage = User._meta.get_field('profile_picture').storage
+
+    def __init__(self, rows, fields=None):
+        self.rows = rows
+        self.fields = fields or self.default_fields
+
+    @classmethod
+    def queryset(cls, queryset, extra=(), fields=None):
+        # `extra`: annotations/columns the paginator orders by (e.g. search_rank)
+        fields = fields or cls.default_fields
+        if 'excerpt' in fields:
+            # One character more than needed tells whether the text was cut
+            queryset = queryset.annotate(excerpt=Substr('content', 1, cls.excerpt_length + 1))
+        columns = [column for name in fields for column in cls.field_columns[name]]
+        return queryset.values(*dict.fromkeys([*columns, *extra]))
+
+    @property
+    def data(self):
+        # Resolved once per page instead of once per value (DateTimeField.enforce_timezone)
+        self.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        fields = [(name, getattr(self, f'get_{name}', None) or itemgetter(name)) for name in self.fields]
+        with timed('serialize'):
+            return [{name: get(row) for name, get in fields} for row in self.rows]
+
+    def get_image(self, row):
+        return self.image_storage.url(row['image']) if row['image'] else None
+
+    def get_image_variants(self, row):
+        return variant_urls(self.image_storage, row['image_variants'])
+
+    def get_author(self, row):
+        return {
+            'id': row['author_id'],
+            'username': row['author__username'],
+            'is_admin': row['author__is_admin'],
+            'profile_picture': (self.picture_storage.url(row['author__profile_picture'])
+                                if row['author__profile_picture'] else None),
+            'profile_picture_variants': variant_urls(self.picture_storage, row['author__profile_picture_variants']),
+            'email': row['author__email'],
+        }
+
+    def get_category(self, row):
+        if row['category_id'] is None:
+            return None
+        return {'id': row['category_id'], 'name': row['category__name'], 'description': row['category__description']}
+
+    def get_excerpt(self, row):
+        text = row['excerpt']
+        return text[:self.excerpt_length] + '…' if len(text) > self.excerpt_length else text
+
+    def format_datetime(self, value):
+        # Same as DateTimeField.to_representation with the ISO 8601 default
+        if value is None:
+            return None
+        if self.timezone is not None:
+            value = value.astimezone(self.timezone)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    def get_created_at(self, row):
+        return self.format_datetime(row['created_at'])
+
+    def get_updated_at(self, row):
+        return self.format_datetime(row['updated_at'])
+
+    def get_publish_at(self, row):
+        return self.format_datetime(row['publish_at'])
+
+    def get_deleted_at(self, row):
+        return self.format_datetime(row['deleted_at'])
+
+    def get_last_comment_at(self, row):
+        return self.format_datetime(row['last_comment_at'])
+
+
+
+
+# Bulk import rows (see blog.bulk.import_blogs)
+class BlogImportSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(max_length=100)
+    created_at = serializers.DateTimeField(required=False)
+
+    class Meta:
+        model = Blog
+        fields = ['title', 'content', 'category_name', 'created_at', 'is_published', 'publish_at']
+
+
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
         write_only=True,
@@ -92,6 +225,9 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'email', 'password', 'password2','profile_picture',]
 
+    def validate_profile_picture(self, value):
+        return deduplicate(value, User._meta.get_field('profile_picture'))
+
     def validate(self, attrs):
         if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({"password": "Passwords do not match."})
@@ -102,13 +238,16 @@ class RegisterSerializer(serializers.ModelSerializer):
         user = User.objects.create_user(
             username=validated_data['username'],
             email=validated_data['email'],
-            password=validated_data['password']
+            password=validated_data['password'],
+            profile_picture=validated_data.get('profile_picture'),
         )
         return user
     
     
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = RefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
@@ -116,6 +255,11 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['email'] = user.email
         token['is_admin'] = user.is_admin
         return token
+
+
+class RefreshTokenSerializer(TokenRefreshSerializer):
+    # SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER']: blacklist checks through the bloom filter
+    token_class = RefreshToken
  
  
     
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Blog, Category, Comment, User
+from . import caching, search
+from .authentication import forget_user
+from .blacklist import BlacklistedToken, blacklist_filter
+from .category_cache import invalidate_categories
+
+
+# Keep the search index in step with the blog text
+@receiver(post_save, sender=Blog)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'content'} & set(update_fields):
+        return
+    search.index_blog(instance)
+
+
+# Any change to data embedded in blog responses invalidates the response cache
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Comment)  # comment counters on Blog are written with update()
+def invalidate_blog_cache(sender, **kwargs):
+    caching.invalidate()
+
+
+@receiver(post_save, sender=User)
+def invalidate_blog_cache_for_user(sender, created=False, update_fields=None, **kwargs):
+    # New users appear in no cached response yet, and logins only touch last_login,
+    # which blog responses do not include
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    caching.invalidate()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, **kwargs):
+    invalidate_categories()
+
+
+# Cached is_active/is_admin used by ClaimsJWTAuthentication
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_auth_state(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    forget_user(instance.pk)
+
+
+# Every blacklisting reaches the bloom filters, whoever creates the row
+@receiver(post_save, sender=BlacklistedToken)
+def publish_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        blacklist_filter.publish(instance.token.jti)
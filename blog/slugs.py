@@ -0,0 +1,39 @@
+import re
+
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+MAX_BASE_LENGTH = 100
+
+
+def slug_base(title):
+    return slugify(title)[:MAX_BASE_LENGTH].strip('-') or 'blog'
+
+
+def unique_slug(queryset, base, reserved=()):
+    # base if free, else base-<n+1> after the highest numbered base-<n>. Two indexed
+    # lookups that return one row each, however many slugs share the prefix
+    if base not in reserved and not queryset.filter(slug=base).exists():
+        return base
+    pattern = rf'^{re.escape(base)}-[0-9]+$'
+    last = (
+        queryset.filter(slug__startswith=f'{base}-', slug__regex=pattern)
+        .order_by(Length('slug').desc(), '-slug')
+        .values_list('slug', flat=True)
+        .first()
+    )
+    numbered = [slug for slug in (last, *reserved) if slug and re.match(pattern, slug)]
+    n = max((int(slug.rsplit('-', 1)[1]) for slug in numbered), default=1)
+    return f'{base}-{n + 1}'
+
+
+def unique_slugs(queryset, titles):
+    # Slugs for a batch: one query for the plain bases, plus one per base that collides
+    bases = [slug_base(title) for title in titles]
+    taken = set(queryset.filter(slug__in=set(bases)).values_list('slug', flat=True))
+    slugs = []
+    for base in bases:
+        slug = base if base not in taken else unique_slug(queryset, base, reserved=taken)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
@@ -1,16 +1,49 @@
 from django.test import TestCase
-from django.db import IntegrityError
-from .models import User,Category,Blog,Comment
+from django.db import IntegrityError, transaction
+from .models import User,Category,Blog,Comment,SearchTerm,OutboxEmail
 from django.utils import timezone
 from .serializers import UserSerailizer,CategorySerializer,BlogSerializer,CommentSerializer,RegisterSerializer,PasswordResetSerializer
-from .serializers import MyTokenObtainPairSerializer
+from .serializers import MyTokenObtainPairSerializer, BlogRowSerializer
+from .renderers import FastJSONRenderer
+from rest_framework.renderers import JSONRenderer
+from .publishing import publish_due_blogs
+from .conditional import blog_validators
+from .outbox import send_pending
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from io import StringIO
+import json
+import base64
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from .thumbnails import generate_pending
+from .metrics import registry
+from . import caching
+from .throttling import LoginIPThrottle
+from rest_framework.test import APIRequestFactory
+from .seeding import seed_data
+from .blacklist import BlacklistFilter, BloomFilter, RefreshToken as FilteredRefreshToken, blacklist_filter
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from .slugs import slug_base, unique_slug
+from .search import search_blogs
+import tempfile
+from unittest import mock, skipUnless
+import shutil
+import os
+from io import BytesIO
+from PIL import Image
 
 
 # User Model 
@@ -319,3 +352,1242 @@ class MyTokenObtainPairSerializerTest(TestCase):
           
 
 
+
+
+#---------------API tests
+# blog_list_create keyset pagination
+# ::first page + next cursor
+# ::walking all pages returns every blog exactly once
+# ::previous cursor returns the earlier page
+# ::invalid cursor, including well-formed cursors with unusable values
+
+class BlogListPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="pager",
+            email="pager@example.com",
+            password="password123"
+        )
+        self.category = Category.objects.create(name="Paging")
+        now = timezone.now()
+        # same created_at for some rows so the id tie-breaker is exercised
+        self.blogs = [
+            Blog.objects.create(
+                title=f"Blog {i}",
+                content="content",
+                author=self.user,
+                category=self.category,
+                is_published=True,
+                created_at=now - timezone.timedelta(minutes=i // 2),
+            )
+            for i in range(7)
+        ]
+        self.client.force_authenticate(self.user)
+        self.url = reverse('blog-list-create')
+
+    def test_first_page(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_walk_all_pages(self):
+        seen = []
+        url = self.url + '?page_size=3'
+        while url:
+            response = self.client.get(url)
+            seen.extend(blog['id'] for blog in response.data['results'])
+            url = response.data['next']
+        expected = [b.id for b in sorted(self.blogs, key=lambda b: (b.created_at, b.id), reverse=True)]
+        self.assertEqual(seen, expected)
+
+    def test_previous_page(self):
+        first = self.client.get(self.url, {'page_size': 3})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(
+            [b['id'] for b in back.data['results']],
+            [b['id'] for b in first.data['results']],
+        )
+        self.assertIsNone(back.data['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        comments_url = reverse('comment-list-create', args=[Blog.objects.first().pk])
+        for values in (["garbage", 1], [{}, 1], [None, 1], ["2024-01-01T00:00:00+00:00", "x"]):
+            cursor = base64.urlsafe_b64encode(json.dumps({'v': values}).encode()).decode()
+            for url in (self.url, comments_url):
+                self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+# Query counts
+# ::blog list / detail / comment list run a constant number of queries,
+#   independent of how many rows (and distinct authors/categories) are returned
+
+class QueryCountMixin:
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url, add_rows):
+        small = self.count_queries(url)
+        add_rows()
+        large = self.count_queries(url)
+        self.assertEqual(small, large, "query count grows with result size (N+1)")
+
+
+class QueryCountTest(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="reader",
+            email="reader@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.blog = self.make_blogs(1)[0]
+
+    def make_blogs(self, n):
+        blogs = []
+        for _ in range(n):
+            i = Blog.objects.count()
+            author = User.objects.create_user(username=f"author{i}", email=f"author{i}@example.com", password="x")
+            category = Category.objects.create(name=f"Category {i}")
+            blogs.append(Blog.objects.create(
+                title=f"Blog {i}", content="content", author=author, category=category, is_published=True
+            ))
+        return blogs
+
+    def make_comments(self, n):
+        for _ in range(n):
+            i = Comment.objects.count()
+            author = User.objects.create_user(username=f"commenter{i}", email=f"commenter{i}@example.com", password="x")
+            Comment.objects.create(blog=self.blog, author=author, content=f"Comment {i}")
+
+    def test_blog_list_queries(self):
+        self.assertConstantQueries(reverse('blog-list-create'), lambda: self.make_blogs(5))
+
+    def test_blog_detail_queries(self):
+        self.assertLessEqual(self.count_queries(reverse('blog-detail', args=[self.blog.pk])), 1)
+
+    def test_comment_list_queries(self):
+        self.make_comments(1)
+        url = reverse('comment-list-create', args=[self.blog.pk])
+        self.assertConstantQueries(url, lambda: self.make_comments(5))
+
+
+# Search (inverted index backend)
+# ::index maintained on save, dropped on delete
+# ::matches title/content words, title matches rank higher
+# ::search results are paginated by relevance
+# ::queries without searchable words return an empty page
+# ::only blogs found through the term index are ranked (no scan of blog_blog)
+
+class BlogSearchTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="searcher",
+            email="searcher@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.in_content = Blog.objects.create(
+            title="Weekend notes", content="Some thoughts on Django migrations", author=self.user, is_published=True
+        )
+        self.in_title = Blog.objects.create(
+            title="Django tips", content="Short and useful", author=self.user, is_published=True
+        )
+        self.unrelated = Blog.objects.create(
+            title="Cooking", content="Pasta recipes", author=self.user, is_published=True
+        )
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('blog-list-create'), {'search': query, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_index_updates_on_save_and_delete(self):
+        self.unrelated.content = "Pasta and Django"
+        self.unrelated.save()
+        self.assertTrue(SearchTerm.objects.filter(blog=self.unrelated, term="django").exists())
+        self.unrelated.delete()
+        self.assertFalse(SearchTerm.objects.filter(term="pasta").exists())
+
+    def test_search_ranked_by_relevance(self):
+        results = self.search("django").data['results']
+        self.assertEqual([b['id'] for b in results], [self.in_title.id, self.in_content.id])
+
+    def test_search_no_match(self):
+        self.assertEqual(self.search("kubernetes").data['results'], [])
+
+    def test_search_without_tokens(self):
+        for query in ("a", "?!"):
+            self.assertEqual(self.search(query).data['results'], [])
+        token = RefreshToken.for_user(self.user).access_token
+        response = self.client.get(reverse('async-blog-list'), {'search': "a"},
+                                   headers={'Authorization': f"Bearer {token}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_search_pagination(self):
+        first = self.search("django", page_size=1)
+        second = self.client.get(first.data['next'])
+        self.assertEqual(second.data['results'][0]['id'], self.in_content.id)
+        self.assertIsNone(second.data['next'])
+
+    @skipUnless(connection.vendor == 'sqlite', "SQLite query plan")
+    def test_search_uses_term_index(self):
+        plan = search_blogs(Blog.objects.filter(is_published=True), "django tips").order_by('-search_rank').explain()
+        self.assertIn("searchterm_term_blog_idx (term=?)", plan)
+        self.assertNotIn("SCAN blog_blog", plan)
+
+
+# Response cache
+# ::repeated feed/detail requests are served without touching the database
+# ::saving a blog or category invalidates cached pages
+# ::registering a user does not
+# ::pages cached while a write is still uncommitted are dropped at commit
+
+class BlogResponseCacheTest(QueryCountMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="cached",
+            email="cached@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name="Caching")
+        self.blog = Blog.objects.create(
+            title="Cached blog", content="content", author=self.user, category=self.category, is_published=True
+        )
+
+    def test_feed_served_from_cache(self):
+        url = reverse('blog-list-create')
+        self.count_queries(url)
+        self.assertEqual(self.count_queries(url), 0)
+        # different filters are cached separately
+        self.assertGreater(self.count_queries(url + '?category=%d' % self.category.pk), 0)
+
+    def test_detail_served_from_cache(self):
+        url = reverse('blog-detail', args=[self.blog.pk])
+        self.count_queries(url)
+        self.assertEqual(self.count_queries(url), 0)
+
+    def test_blog_save_invalidates(self):
+        url = reverse('blog-detail', args=[self.blog.pk])
+        self.client.get(url)
+        self.blog.title = "Updated title"
+        self.blog.save()
+        self.assertEqual(self.client.get(url).data['title'], "Updated title")
+
+    def test_category_save_invalidates(self):
+        url = reverse('blog-list-create')
+        self.client.get(url)
+        self.category.name = "Renamed"
+        self.category.save()
+        self.assertEqual(self.client.get(url).data['results'][0]['category']['name'], "Renamed")
+
+    def test_new_user_keeps_cache(self):
+        url = reverse('blog-list-create')
+        self.client.get(url)
+        User.objects.create_user(username="newcomer", email="newcomer@example.com", password="password123")
+        self.assertEqual(self.count_queries(url), 0)
+        self.user.username = "renamed"
+        self.user.save()
+        self.assertGreater(self.count_queries(url), 0)
+
+    def test_invalidated_again_after_commit(self):
+        url = reverse('blog-detail', args=[self.blog.pk])
+        self.client.get(url)
+        before = caching.get_cached(caching.detail_key(self.blog.pk))
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Comment.objects.create(blog=self.blog, author=self.user, content="new")
+            # A concurrent request still reading the pre-commit row caches it under the new generation
+            caching.set_cached(caching.detail_key(self.blog.pk), before)
+        self.assertEqual(self.client.get(url).data['comment_count'], 1)
+
+
+# Conditional GET
+# ::blog detail / detail by title / comments send ETag + Last-Modified
+# ::matching If-None-Match returns 304 with no body
+# ::new comments change the comment list ETag
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="poller",
+            email="poller@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.blog = Blog.objects.create(title="Polled", content="content", author=self.user, is_published=True)
+
+    def assertNotModified(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], etag)
+        return etag
+
+    def test_blog_detail(self):
+        url = reverse('blog-detail', args=[self.blog.pk])
+        etag = self.assertNotModified(url)
+        # the second 304 comes from the response cache
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.blog.content = "changed"
+        self.blog.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_blog_detail_by_title(self):
+        self.assertNotModified(reverse('blog-detail-by-title', args=[self.blog.title]))
+
+    def test_comment_list(self):
+        Comment.objects.create(blog=self.blog, author=self.user, content="first")
+        url = reverse('comment-list-create', args=[self.blog.pk])
+        etag = self.assertNotModified(url)
+        Comment.objects.create(blog=self.blog, author=self.user, content="second")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+# Scheduled publishing
+# ::due posts are published in one batch, future posts are left alone
+# ::management command reports batch size and lag
+# ::publishing changes the blog's ETag
+# ::batch size and lag are exported as metrics
+
+class ScheduledPublishingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="scheduler",
+            email="scheduler@example.com",
+            password="password123"
+        )
+        self.now = timezone.now()
+        self.due = [
+            Blog.objects.create(title=f"Due {i}", content="c", author=self.user,
+                                publish_at=self.now + timezone.timedelta(minutes=i + 1))
+            for i in range(3)
+        ]
+        self.future = Blog.objects.create(title="Future", content="c", author=self.user,
+                                          publish_at=self.now + timezone.timedelta(days=1))
+
+    def test_publish_due_blogs(self):
+        result = publish_due_blogs(now=self.now + timezone.timedelta(minutes=10))
+        self.assertEqual(result.batch, 3)
+        self.assertEqual(result.lag, 9 * 60)
+        self.assertEqual(Blog.objects.filter(is_published=True).count(), 3)
+        self.assertFalse(Blog.objects.get(pk=self.future.pk).is_published)
+        self.assertEqual(publish_due_blogs(now=self.now + timezone.timedelta(minutes=10)).batch, 0)
+
+    def test_publish_metrics(self):
+        registry.clear()
+        publish_due_blogs(now=self.now + timezone.timedelta(minutes=10))
+        publish_due_blogs(now=self.now + timezone.timedelta(minutes=10))
+        metrics = registry.exposition()
+        self.assertIn('blog_publish_ticks_total 2\n', metrics)
+        self.assertIn('blog_published_total 3\n', metrics)
+        self.assertIn('blog_publish_batch 0\n', metrics)
+        self.assertIn('# TYPE blog_publish_lag_seconds gauge\nblog_publish_lag_seconds 0.0\n', metrics)
+
+    def test_publish_changes_etag(self):
+        etag, _ = blog_validators(self.due[0])
+        publish_due_blogs(now=self.now + timezone.timedelta(minutes=10))
+        self.assertNotEqual(blog_validators(Blog.objects.get(pk=self.due[0].pk))[0], etag)
+
+    def test_publish_command(self):
+        Blog.objects.filter(pk=self.due[0].pk).update(publish_at=self.now - timezone.timedelta(minutes=1))
+        out = StringIO()
+        call_command('publish_scheduled', stdout=out)
+        self.assertIn("published=1", out.getvalue())
+        self.assertTrue(Blog.objects.get(pk=self.due[0].pk).is_published)
+
+
+# Email outbox
+# ::password reset request queues the email instead of sending it
+# ::worker sends queued emails in a batch and marks them sent
+# ::failures are retried with backoff, then given up on
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError("SMTP unavailable")
+
+
+class OutboxTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="forgetful",
+            email="forgetful@example.com",
+            password="password123"
+        )
+
+    def test_reset_request_queues_email(self):
+        response = self.client.post(reverse('password-reset-request'), {'email': self.user.email})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.recipients, [self.user.email])
+        self.assertIn("reset-password-confirm", queued.body)
+
+    def test_send_pending(self):
+        for i in range(3):
+            OutboxEmail.objects.create(subject=f"Mail {i}", body="body", from_email="a@b.com", recipients=["x@y.com"])
+        self.assertEqual(send_pending(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.SENT).exists())
+        self.assertEqual(send_pending(), (0, 0))
+
+    @override_settings(EMAIL_BACKEND='blog.tests.FailingEmailBackend')
+    def test_failed_send_is_retried_later(self):
+        email = OutboxEmail.objects.create(subject="Mail", body="body", from_email="a@b.com", recipients=["x@y.com"])
+        with self.assertLogs('blog.outbox', level='WARNING'):
+            self.assertEqual(send_pending(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn("SMTP unavailable", email.last_error)
+
+
+# Async (ASGI) read endpoints
+# ::require a valid JWT
+# ::return the same payloads as the sync views
+# ::DRF errors (bad cursor, bad fields) get the same status as the sync views
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="asyncuser",
+            email="asyncuser@example.com",
+            password="password123"
+        )
+        self.category = Category.objects.create(name="Async")
+        self.blog = Blog.objects.create(
+            title="Async blog", content="content", author=self.user, category=self.category, is_published=True
+        )
+        Comment.objects.create(blog=self.blog, author=self.user, content="async comment")
+        self.auth = {'headers': {'Authorization': f"Bearer {RefreshToken.for_user(self.user).access_token}"}}
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get(reverse('async-blog-list'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_rejects_writes(self):
+        response = await self.async_client.post(reverse('async-blog-list'), {}, **self.auth)
+        self.assertEqual(response.status_code, 405)
+
+    async def test_matches_sync_views(self):
+        for sync_name, async_name, args in [
+            ('category-list-create', 'async-category-list', []),
+            ('blog-list-create', 'async-blog-list', []),
+            ('blog-detail', 'async-blog-detail', [self.blog.pk]),
+            ('comment-list-create', 'async-comment-list', [self.blog.pk]),
+        ]:
+            sync_response = await self.async_client.get(reverse(sync_name, args=args), **self.auth)
+            async_response = await self.async_client.get(reverse(async_name, args=args), **self.auth)
+            self.assertEqual(sync_response.status_code, 200)
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    async def test_errors_match_sync_views(self):
+        for sync_name, async_name, args, params in [
+            ('blog-list-create', 'async-blog-list', [], {'cursor': 'xx'}),
+            ('comment-list-create', 'async-comment-list', [self.blog.pk], {'cursor': 'xx'}),
+            ('blog-list-create', 'async-blog-list', [], {'fields': 'nope'}),
+        ]:
+            sync_response = await self.async_client.get(reverse(sync_name, args=args), params, **self.auth)
+            async_response = await self.async_client.get(reverse(async_name, args=args), params, **self.auth)
+            self.assertIn(sync_response.status_code, (400, 404))
+            self.assertEqual(async_response.status_code, sync_response.status_code)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+
+# Bulk import / export
+# ::admin can import a batch; categories resolved in bulk, constant query count
+# ::invalid rows reject the whole batch
+# ::non-admin forbidden
+# ::export streams NDJSON that can be imported again
+# ::ids and search index are filled in on backends without bulk insert RETURNING (MySQL)
+
+class BulkImportExportTest(QueryCountMixin, APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="admin",
+            email="admin@example.com",
+            password="password123",
+            is_admin=True
+        )
+        self.client.force_authenticate(self.admin)
+        Category.objects.create(name="Existing")
+
+    def rows(self, n, prefix="Imported"):
+        return [
+            {"title": f"{prefix} {i}", "content": f"Imported content {i}",
+             "category_name": "Existing" if i % 2 else f"New {i % 3}"}
+            for i in range(n)
+        ]
+
+    def test_bulk_import(self):
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(reverse('blog-bulk-import'), self.rows(4), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 4)
+        self.assertEqual(Blog.objects.count(), 4)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertTrue(SearchTerm.objects.filter(term="imported").exists())
+
+        with CaptureQueriesContext(connection) as large:
+            self.client.post(reverse('blog-bulk-import'), self.rows(40, prefix="Second"), format='json')
+        self.assertEqual(Blog.objects.count(), 44)
+        self.assertLessEqual(len(large.captured_queries), len(small.captured_queries))
+
+    def test_import_without_returning(self):
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            response = self.client.post(reverse('blog-bulk-import'), self.rows(3), format='json')
+        ids = response.data['ids']
+        self.assertEqual(sorted(ids), sorted(Blog.objects.values_list('pk', flat=True)))
+        self.assertEqual(set(SearchTerm.objects.filter(term="imported").values_list('blog_id', flat=True)), set(ids))
+
+    def test_invalid_row_rejects_batch(self):
+        rows = self.rows(3)
+        del rows[1]['title']
+        response = self.client.post(reverse('blog-bulk-import'), rows, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Blog.objects.count(), 0)
+
+    def test_non_admin_forbidden(self):
+        user = User.objects.create_user(username="plain", email="plain@example.com", password="password123")
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.post(reverse('blog-bulk-import'), self.rows(1), format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('blog-export')).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_round_trip(self):
+        self.client.post(reverse('blog-bulk-import'), self.rows(5), format='json')
+        response = self.client.get(reverse('blog-export'))
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual([row['title'] for row in lines], [f"Imported {i}" for i in range(5)])
+
+        Blog.objects.all().delete()
+        for row in lines:
+            for key in ('id', 'author', 'updated_at'):
+                del row[key]
+        response = self.client.post(reverse('blog-bulk-import'), lines, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Blog.objects.count(), 5)
+
+
+# Denormalized comment counters
+# ::creating comments increments comment_count and moves last_comment_at
+# ::soft_delete decrements and recomputes last_comment_at (only once)
+# ::rebuild_comment_counts repairs drifted counters
+# ::BlogSerializer exposes the counters
+
+class CommentCounterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="counter",
+            email="counter@example.com",
+            password="password123"
+        )
+        self.blog = Blog.objects.create(title="Counted", content="content", author=self.user)
+        now = timezone.now()
+        self.older = Comment.objects.create(blog=self.blog, author=self.user, content="older",
+                                            created_at=now - timezone.timedelta(hours=1))
+        self.newer = Comment.objects.create(blog=self.blog, author=self.user, content="newer", created_at=now)
+
+    def test_counters_on_create(self):
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.comment_count, 2)
+        self.assertEqual(self.blog.last_comment_at, self.newer.created_at)
+
+    def test_counters_on_soft_delete(self):
+        self.newer.soft_delete()
+        self.newer.soft_delete()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.comment_count, 1)
+        self.assertEqual(self.blog.last_comment_at, self.older.created_at)
+        self.older.soft_delete()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.comment_count, 0)
+        self.assertIsNone(self.blog.last_comment_at)
+
+    def test_rebuild_command(self):
+        Blog.objects.update(comment_count=42, last_comment_at=None)
+        Comment.objects.filter(pk=self.newer.pk).update(deleted_at=timezone.now())
+        call_command('rebuild_comment_counts', batch_size=1, stdout=StringIO())
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.comment_count, 1)
+        self.assertEqual(self.blog.last_comment_at, self.older.created_at)
+
+    def test_serializer_fields(self):
+        self.blog.refresh_from_db()
+        data = BlogSerializer(self.blog).data
+        self.assertEqual(data['comment_count'], 2)
+        self.assertIsNotNone(data['last_comment_at'])
+
+
+# Comment listing
+# ::soft-deleted comments are not returned
+# ::comments are paginated oldest first with cursors
+
+class CommentListPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="talker",
+            email="talker@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.blog = Blog.objects.create(title="Busy", content="content", author=self.user, is_published=True)
+        start = timezone.now()
+        self.comments = [
+            Comment.objects.create(blog=self.blog, author=self.user, content=f"Comment {i}",
+                                   created_at=start + timezone.timedelta(seconds=i))
+            for i in range(5)
+        ]
+        self.url = reverse('comment-list-create', args=[self.blog.pk])
+
+    def test_soft_deleted_hidden(self):
+        self.comments[1].soft_delete()
+        ids = [c['id'] for c in self.client.get(self.url).data['results']]
+        self.assertNotIn(self.comments[1].id, ids)
+        self.assertEqual(len(ids), 4)
+
+    def test_pages_oldest_first(self):
+        seen = []
+        url = self.url + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen.extend(c['id'] for c in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [c.id for c in self.comments])
+
+
+# Soft-deleted blogs
+# ::DELETE marks the blog deleted instead of removing it
+# ::deleted blogs disappear from the feed, detail and comments
+# ::purge_deleted_blogs hard-deletes old ones (and their comments) only
+
+class BlogSoftDeleteTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="deleter",
+            email="deleter@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.blog = Blog.objects.create(title="Doomed", content="content", author=self.user, is_published=True)
+        Comment.objects.create(blog=self.blog, author=self.user, content="comment")
+
+    def test_delete_is_soft(self):
+        self.client.get(reverse('blog-list-create'))
+        response = self.client.delete(reverse('blog-detail', args=[self.blog.pk]))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIsNotNone(Blog.all_objects.get(pk=self.blog.pk).deleted_at)
+        self.assertEqual(Comment.objects.filter(blog_id=self.blog.pk).count(), 1)
+
+        self.assertEqual(self.client.get(reverse('blog-list-create')).data['results'], [])
+        self.assertEqual(self.client.get(reverse('blog-detail', args=[self.blog.pk])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('comment-list-create', args=[self.blog.pk])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    def test_purge(self):
+        recent = Blog.objects.create(title="Recent", content="content", author=self.user)
+        recent.soft_delete()
+        self.blog.soft_delete()
+        Blog.all_objects.filter(pk=self.blog.pk).update(deleted_at=timezone.now() - timezone.timedelta(days=40))
+
+        out = StringIO()
+        call_command('purge_deleted_blogs', days=30, batch_size=1, stdout=out)
+        self.assertIn("purged_blogs=1 purged_comments=1", out.getvalue())
+        self.assertFalse(Blog.all_objects.filter(pk=self.blog.pk).exists())
+        self.assertFalse(Comment.objects.filter(blog_id=self.blog.pk).exists())
+        self.assertTrue(Blog.all_objects.filter(pk=recent.pk).exists())
+
+
+# Slugs
+# ::unique slug generated on save, kept when the title changes
+# ::duplicate titles get numbered slugs; bulk import too
+# ::numbering only looks at base and base-<n>, never at longer slugs sharing the prefix
+# ::slug route, and title route no longer fails on duplicate titles
+# ::title route finds renamed blogs by their new title
+
+class BlogSlugTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="slugger",
+            email="slugger@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def make(self, title):
+        return Blog.objects.create(title=title, content="content", author=self.user, is_published=True)
+
+    def test_slug_generation(self):
+        first, second, third = self.make("Hello World!"), self.make("hello world"), self.make("Hello, World")
+        self.assertEqual([first.slug, second.slug, third.slug], ["hello-world", "hello-world-2", "hello-world-3"])
+        first.title = "Renamed"
+        first.save()
+        self.assertEqual(first.slug, "hello-world")
+        self.assertEqual(self.make("!!!").slug, "blog")
+
+    def test_numbering_ignores_longer_slugs(self):
+        for title in ("a", "ab", "a b", "a 7 b", "a 5"):
+            self.make(title)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(unique_slug(Blog.all_objects, "a"), "a-6")
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(unique_slug(Blog.all_objects, "a", reserved={"a-6", "a-b"}), "a-7")
+
+    def test_bulk_import_slugs(self):
+        self.make("Same")
+        items = [{"title": "Same", "content": "c", "category_name": "C"} for _ in range(2)]
+        self.user.is_admin = True
+        self.user.save()
+        self.client.post(reverse('blog-bulk-import'), items, format='json')
+        self.assertEqual(sorted(Blog.objects.values_list('slug', flat=True)), ["same", "same-2", "same-3"])
+
+    def test_slug_route(self):
+        blog = self.make("Find me")
+        response = self.client.get(reverse('blog-detail-by-slug', args=["find-me"]))
+        self.assertEqual(response.data['id'], blog.id)
+        self.assertEqual(self.client.get(reverse('blog-detail-by-slug', args=["missing"])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+    def test_title_route_with_duplicates(self):
+        first = self.make("Twin")
+        self.make("Twin")
+        response = self.client.get(reverse('blog-detail-by-title', args=["Twin"]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], first.id)
+
+    def test_title_route_after_rename(self):
+        blog = self.make("Old Title")
+        self.client.put(reverse('blog-detail', args=[blog.id]), {"title": "New Title"})
+        response = self.client.get(reverse('blog-detail-by-title', args=["New Title"]))
+        self.assertEqual(response.data['id'], blog.id)
+        self.assertEqual(self.client.get(reverse('blog-detail-by-title', args=["Old Title"])).status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+
+# Category cache
+# ::category listing and blog writes reuse the in-process copy (no category queries)
+# ::creating/renaming a category is visible immediately
+
+class CategoryCacheTest(QueryCountMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username="curator",
+            email="curator@example.com",
+            password="password123",
+            is_admin=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.category = Category.objects.create(name="Cached")
+
+    def test_listing_served_from_memory(self):
+        url = reverse('category-list-create')
+        self.count_queries(url)
+        self.assertEqual(self.count_queries(url), 0)
+
+    def test_blog_create_uses_cache(self):
+        self.client.get(reverse('category-list-create'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(reverse('blog-list-create'),
+                                        {"title": "New", "content": "c", "category_name": "Cached"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['category']['id'], self.category.id)
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "blog_category"' in q['sql']])
+
+    def test_writes_invalidate(self):
+        url = reverse('category-list-create')
+        self.client.get(url)
+        self.client.post(url, {"name": "Fresh"})
+        self.category.name = "Renamed"
+        self.category.save()
+        names = [c['name'] for c in self.client.get(url).data]
+        self.assertEqual(names, ["Renamed", "Fresh"])
+
+
+# Fast blog list serialization
+# ::BlogRowSerializer + FastJSONRenderer write the same bytes as BlogSerializer + JSONRenderer
+
+class FastBlogSerializationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="fast",
+            email="fast@example.com",
+            password="password123"
+        )
+        self.user.profile_picture = "profile_pics/me.png"
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(name="Ünïcode", description="line\u2028break")
+        Blog.objects.create(title="Café ☕", content="a\u2029b \"quoted\"", author=self.user,
+                            category=category, is_published=True, image="blog_image/x.png",
+                            created_at=(timezone.now() - timezone.timedelta(days=1)).replace(microsecond=123456))
+        Blog.objects.create(title="No category", content="plain", author=self.user, is_published=True,
+                            publish_at=timezone.now())
+
+    def test_same_bytes_as_drf(self):
+        blogs = Blog.objects.select_related('author', 'category').order_by('id')
+        expected = JSONRenderer().render(BlogSerializer(blogs, many=True).data)
+        actual = FastJSONRenderer().render(BlogRowSerializer(BlogRowSerializer.queryset(blogs)).data)
+        self.assertEqual(actual, expected)
+
+    def test_list_endpoint_unchanged(self):
+        url = reverse('blog-list-create')
+        fast = self.client.get(url, {'page_size': 1})
+        cache.clear()
+        with override_settings(BLOG_FAST_SERIALIZER=False):
+            slow = self.client.get(url, {'page_size': 1})
+        self.assertEqual(fast.content, slow.content)
+        self.assertEqual(self.client.get(fast.data['next']).data['results'][0]['title'], "Café ☕")
+
+    def test_indent_falls_back(self):
+        data = {'title': "Café"}
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'),
+                         JSONRenderer().render(data, 'application/json; indent=2'))
+
+
+# Sparse fieldsets / excerpt mode on the blog list
+# ::only the requested columns are selected, long content is cut by the database
+
+class BlogSparseFieldsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="sparse",
+            email="sparse@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse('blog-list-create')
+        Blog.objects.create(title="Long", content="x" * 5000, author=self.user, is_published=True)
+
+    def test_fields(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {'fields': 'title,slug'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'title': "Long", 'slug': "long"}])
+        select = [q['sql'] for q in ctx.captured_queries if 'FROM "blog_blog"' in q['sql']][0]
+        self.assertNotIn('"content"', select)
+        self.assertNotIn('blog_user', select)
+
+    def test_excerpt(self):
+        response = self.client.get(self.url, {'excerpt': 'true'})
+        blog = response.data['results'][0]
+        self.assertNotIn('content', blog)
+        self.assertEqual(blog['excerpt'], "x" * BlogRowSerializer.excerpt_length + "…")
+        self.assertEqual(blog['author']['username'], "sparse")
+
+        response = self.client.get(self.url, {'fields': 'title,excerpt'})
+        self.assertEqual(list(response.data['results'][0]), ['title', 'excerpt'])
+
+    def test_unknown_field(self):
+        response = self.client.get(self.url, {'fields': 'title,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data['fields'])
+
+
+# Image variants
+# ::generate_thumbnails resizes uploads off the request path, shares files between identical uploads
+# ::the worker polls the indexed <field>_pending flag, not the JSON column
+
+def image_upload(name, size=(800, 400), mode='RGBA'):
+    buffer = BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class TempMediaMixin:
+    def use_temp_media(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ThumbnailTest(TempMediaMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.use_temp_media()
+        self.user = User.objects.create_user(
+            username="pictures",
+            email="pictures@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_blog(self, image):
+        return Blog.objects.create(title="Pictured", content="c", author=self.user, is_published=True, image=image)
+
+    def test_variants_generated_and_served(self):
+        blog = self.create_blog(image_upload("a.png"))
+        self.assertEqual(generate_pending(), (1, 0))
+        blog.refresh_from_db()
+        self.assertEqual(set(blog.image_variants['webp']), {'320', '640'})
+        path = os.path.join(self.media_root, blog.image_variants['jpeg']['320'])
+        with Image.open(path) as variant:
+            self.assertEqual((variant.format, variant.size), ('JPEG', (320, 160)))
+
+        data = self.client.get(reverse('blog-detail', args=[blog.pk])).data
+        self.assertEqual(data['image_variants']['webp']['640'], '/media/' + blog.image_variants['webp']['640'])
+        self.assertEqual(self.client.get(reverse('blog-list-create')).data['results'][0]['image_variants'],
+                         data['image_variants'])
+        self.assertEqual(generate_pending(), (0, 0))
+
+    def test_identical_uploads_share_files(self):
+        first, second = self.create_blog(image_upload("a.png")), self.create_blog(image_upload("b.png"))
+        generate_pending()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image_variants['webp'], second.image_variants['webp'])
+        self.assertNotEqual(first.image_variants['source'], second.image_variants['source'])
+
+    def test_new_upload_resets_variants(self):
+        blog = self.create_blog(image_upload("small.png", size=(100, 50), mode='RGB'))
+        generate_pending()
+        blog.refresh_from_db()
+        self.assertEqual(set(blog.image_variants['jpeg']), {'100'})
+
+        blog.image.save("broken.png", SimpleUploadedFile("broken.png", b"not an image"))
+        self.assertEqual(blog.image_variants, {})
+        with self.assertLogs('blog.thumbnails', 'WARNING'):
+            self.assertEqual(generate_pending(), (0, 1))
+        blog.refresh_from_db()
+        self.assertIn('error', blog.image_variants)
+        self.assertFalse(blog.image_variants_pending)
+
+    def test_poll_uses_pending_flag(self):
+        self.create_blog(None)
+        blog = self.create_blog(image_upload("a.png"))
+        self.assertEqual(list(Blog.all_objects.filter(image_variants_pending=True)), [blog])
+        with CaptureQueriesContext(connection) as queries:
+            generate_pending()
+        self.assertIn('image_variants_pending', queries[0]['sql'])
+        self.assertFalse(Blog.all_objects.filter(image_variants_pending=True).exists())
+
+    def test_profile_picture_variants(self):
+        self.user.profile_picture = image_upload("me.png")
+        self.user.save()
+        self.create_blog(None)
+        generate_pending()
+        author = self.client.get(reverse('blog-list-create')).data['results'][0]['author']
+        self.assertEqual(set(author['profile_picture_variants']), {'webp', 'jpeg'})
+
+
+# Streaming image uploads
+# ::type/size checked while streaming, identical images stored once
+
+class ImageUploadTest(TempMediaMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.use_temp_media()
+        self.user = User.objects.create_user(
+            username="uploader",
+            email="uploader@example.com",
+            password="password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse('blog-list-create')
+
+    def post_blog(self, image):
+        return self.client.post(self.url, {"title": "Photo", "content": "c", "category_name": "Pics", "image": image},
+                                format='multipart')
+
+    def test_identical_images_stored_once(self):
+        first = self.post_blog(image_upload("one.png"))
+        second = self.post_blog(image_upload("two.png"))
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(first.data['image'], second.data['image'])
+        blog = Blog.objects.get(pk=first.data['id'])
+        self.assertRegex(blog.image.name, r'^blog_image/[0-9a-f]{64}\.png$')
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'blog_image')), [os.path.basename(blog.image.name)])
+
+    def test_rejects_non_images(self):
+        response = self.post_blog(SimpleUploadedFile("notes.txt", b"hello", content_type="text/plain"))
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        response = self.post_blog(SimpleUploadedFile("fake.png", b"<?php echo 1; ?>", content_type="image/png"))
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertFalse(Blog.objects.exists())
+
+    def test_rejects_large_upload(self):
+        with override_settings(BLOG_MAX_UPLOAD_SIZE=1024):
+            buffer = BytesIO()
+            Image.frombytes('RGB', (64, 64), os.urandom(64 * 64 * 3)).save(buffer, 'PNG')
+            response = self.post_blog(SimpleUploadedFile("big.png", buffer.getvalue(), content_type="image/png"))
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_register_with_profile_picture(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(reverse('register'), {
+            "username": "newbie", "email": "newbie@example.com", "password": "Str0ng!Passw0rd",
+            "password2": "Str0ng!Passw0rd", "profile_picture": image_upload("me.png"),
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(User.objects.get(username="newbie").profile_picture.name.startswith("profile_pics/"))
+
+
+# Request instrumentation
+# ::Server-Timing header + Prometheus text, only when BLOG_METRICS_ENABLED
+
+@override_settings(BLOG_METRICS_ENABLED=True)
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.user = User.objects.create_user(
+            username="measured",
+            email="measured@example.com",
+            password="password123"
+        )
+        Blog.objects.create(title="Measured", content="c", author=self.user, is_published=True)
+        self.auth = {'headers': {'Authorization': f"Bearer {RefreshToken.for_user(self.user).access_token}"}}
+
+    def test_server_timing_and_metrics(self):
+        response = self.client.get(reverse('blog-list-create'), **self.auth)
+        self.assertRegex(response['Server-Timing'],
+                         r'^db;dur=[\d.]+;desc="[1-9]\d* queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=')
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        labels = 'endpoint="blog-list-create",method="GET",status="200"'
+        self.assertIn(f'blog_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1', metrics)
+        self.assertIn(f'blog_response_size_bytes_sum{{{labels}}} {float(len(response.content))}', metrics)
+        self.assertRegex(metrics, rf'blog_db_queries_total{{{labels}}} [1-9]')
+
+    async def test_async_views_count_queries(self):
+        await self.async_client.get(reverse('async-blog-list'), **self.auth)
+        metrics = (await self.async_client.get(reverse('metrics'))).content.decode()
+        self.assertRegex(metrics, r'blog_db_queries_total{endpoint="async-blog-list",method="GET",status="200"} [1-9]')
+
+    @override_settings(BLOG_METRICS_TOKEN="s3cret")
+    def test_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': "Bearer s3cret"})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(BLOG_METRICS_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('blog-list-create'), **self.auth)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+# Synthetic data seeding
+# ::seed_data creates users, categories, blogs and comments with consistent counters and slugs
+# ::the same seed and end timestamp give the same data
+# ::refuses to seed a prefix twice
+
+class SeedDataTest(APITestCase):
+    def test_seed(self):
+        out = StringIO()
+        call_command('seed_data', users=5, categories=3, blogs=40, comments=200, batch_size=7,
+                     password="Seed-pass-1", stdout=out, stderr=StringIO())
+        self.assertIn("users=6 categories=3 blogs=40 comments=200", out.getvalue())
+        self.assertTrue(User.objects.get(username='seed-admin').is_admin)
+        self.assertTrue(User.objects.get(username='seed-3').check_password("Seed-pass-1"))
+
+        # Denormalized columns match what Comment.save() would have written
+        for blog in Blog.all_objects.all():
+            comments = blog.comments.order_by('created_at')
+            self.assertEqual(blog.comment_count, comments.count())
+            self.assertEqual(blog.last_comment_at, comments.last().created_at if blog.comment_count else None)
+            self.assertTrue(blog.slug.startswith(slug_base(blog.title)))
+
+        blog = Blog.objects.filter(is_published=True).first()
+        self.client.force_authenticate(blog.author)
+        response = self.client.get(reverse('blog-list-create'), {'search': blog.title})
+        self.assertIn(blog.id, [row['id'] for row in response.data['results']])
+
+    def test_deterministic(self):
+        end = timezone.now()
+        seed_data(users=2, categories=2, blogs=10, comments=20, prefix='a', end=end)
+        seed_data(users=2, categories=2, blogs=10, comments=20, prefix='b', end=end)
+        a, b = (list(Blog.objects.filter(author__username__startswith=f'{prefix}-').order_by('pk')
+                     .values_list('title', 'created_at', 'comment_count')) for prefix in 'ab')
+        self.assertEqual(a, b)
+
+    def test_refuses_existing_prefix(self):
+        seed_data(users=1, categories=1, blogs=1, comments=0)
+        with self.assertRaises(CommandError):
+            call_command('seed_data', blogs=1, stdout=StringIO(), stderr=StringIO())
+
+
+# Stateless JWT authentication
+# ::no User query per request once the user state is cached
+# ::request.user is built from the token claims
+# ::admin/active changes and deletion apply before the token expires
+
+class StatelessAuthTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="claims", email="claims@example.com", password="password123")
+        self.blog = Blog.objects.create(title="Mine", content="c", author=self.user, is_published=True)
+        token = MyTokenObtainPairSerializer.get_token(self.user).access_token
+        self.auth = {'headers': {'Authorization': f"Bearer {token}"}}
+
+    def test_no_user_query_once_cached(self):
+        self.client.get(reverse('category-list-create'), **self.auth)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('category-list-create'), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with override_settings(BLOG_STATELESS_AUTH=False), self.assertNumQueries(1):
+            self.client.get(reverse('category-list-create'), **self.auth)
+
+    def test_user_built_from_claims(self):
+        response = self.client.post(reverse('comment-list-create', args=[self.blog.id]), {"content": "hi"}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['author']['email'], "claims@example.com")
+        response = self.client.put(reverse('blog-detail', args=[self.blog.id]), {"title": "Edited"}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_user_changes_apply_before_token_expiry(self):
+        url = reverse('category-list-create')
+        self.assertEqual(self.client.post(url, {"name": "New"}, **self.auth).status_code, status.HTTP_403_FORBIDDEN)
+        self.user.is_admin = True
+        self.user.save()
+        self.assertEqual(self.client.post(url, {"name": "New"}, **self.auth).status_code, status.HTTP_201_CREATED)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url, **self.auth).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.user.delete()
+        self.assertEqual(self.client.get(url, **self.auth).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+# Refresh token blacklist
+# ::logout and rotation blacklist the used refresh token
+# ::the bloom filter skips the blacklist query for valid tokens
+# ::other processes see blacklistings through the cache log, or rebuild from the database
+# ::prune_tokens deletes expired tokens in batches
+
+@override_settings(BLOG_BLACKLIST_FILTER=True)
+class TokenBlacklistTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        blacklist_filter.reset()
+        self.user = User.objects.create_user(username="leaver", email="leaver@example.com", password="password123")
+        self.refresh = FilteredRefreshToken.for_user(self.user)
+        self.auth = {'headers': {'Authorization': f"Bearer {self.refresh.access_token}"}}
+
+    def test_logout_blacklists_refresh_token(self):
+        response = self.client.post(reverse('logout'), {"refresh": str(self.refresh)}, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+        response = self.client.post(reverse('token_refresh'), {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotation(self):
+        response = self.client.post(reverse('token_refresh'), {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=self.refresh['jti']).exists())
+        response = self.client.post(reverse('token_refresh'), {"refresh": response.data['refresh']})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_filter_skips_query_for_valid_tokens(self):
+        blacklist_filter.might_contain('warm-up')
+        with self.assertNumQueries(0):
+            self.refresh.check_blacklist()
+        with override_settings(BLOG_BLACKLIST_FILTER=False), self.assertNumQueries(1):
+            self.refresh.check_blacklist()
+
+    def test_other_processes_see_blacklisting(self):
+        other = BlacklistFilter()
+        self.assertFalse(other.might_contain(self.refresh['jti']))
+        self.refresh.blacklist()
+        self.assertTrue(other.might_contain(self.refresh['jti']))
+        # Lost log entries force a rebuild from the database
+        cache.clear()
+        self.assertTrue(BlacklistFilter().might_contain(self.refresh['jti']))
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_prune_expired_tokens(self):
+        expired = FilteredRefreshToken.for_user(self.user)
+        expired.blacklist()
+        OutstandingToken.objects.filter(jti=expired['jti']).update(expires_at=timezone.now() - timezone.timedelta(seconds=1))
+        out = StringIO()
+        call_command('prune_tokens', batch_size=1, stdout=out)
+        self.assertEqual(out.getvalue().strip(), "pruned_rows=2")
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [self.refresh['jti']])
+
+
+# Auth endpoint throttling
+# ::login limited per account, rejected before any query, counted in metrics
+# ::register limited per IP (X-Forwarded-For ignored), password reset per account
+# ::sliding window weighs the previous window by its remaining share
+
+class ThrottleTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        User.objects.create_user(username="target", email="target@example.com", password="password123")
+
+    def login(self, username):
+        return self.client.post(reverse('login'), {"username": username, "password": "wrong"})
+
+    @override_settings(BLOG_THROTTLE_RATES={'login_account': '2/m'})
+    def test_login_per_account(self):
+        self.assertEqual(self.login("target").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login("Target").status_code, status.HTTP_401_UNAUTHORIZED)
+        with self.assertNumQueries(0):
+            response = self.login("target")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.login("someone-else").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        metrics = registry.exposition()
+        self.assertIn('blog_throttle_decisions_total{scope="login_account",outcome="allowed"} 3', metrics)
+        self.assertIn('blog_throttle_decisions_total{scope="login_account",outcome="throttled"} 1', metrics)
+
+    @override_settings(BLOG_THROTTLE_RATES={'register_ip': '1/h', 'password_reset_account': '1/h'})
+    def test_register_and_password_reset(self):
+        data = {"username": "new", "email": "new@example.com", "password": "Str0ng-pass!", "password2": "Str0ng-pass!"}
+        self.assertEqual(self.client.post(reverse('register'), data).status_code, status.HTTP_201_CREATED)
+        other = {**data, "username": "new2", "email": "new2@example.com"}
+        response = self.client.post(reverse('register'), other, headers={'X-Forwarded-For': "203.0.113.9"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        url = reverse('password-reset-request')
+        self.assertEqual(self.client.post(url, {"email": "target@example.com"}).status_code, status.HTTP_200_OK)
+        response = self.client.post(url, {"email": "TARGET@example.com"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(BLOG_THROTTLE_RATES={'login_ip': '10/m'})
+    def test_sliding_window(self):
+        request = APIRequestFactory().post('/')
+        throttle = LoginIPThrottle()
+        throttle.timer = lambda: 6000.0  # start of a window
+        self.assertEqual(sum(throttle.allow_request(request, None) for _ in range(12)), 10)
+        self.assertEqual(throttle.wait(), 66.0)  # until the full window weighs 9 of 10
+
+        # Halfway through the next window the previous one still counts for half
+        throttle.timer = lambda: 6090.0
+        self.assertEqual(sum(throttle.allow_request(request, None) for _ in range(12)), 5)
+        self.assertAlmostEqual(throttle.wait(), 6.0)
@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import registry
+
+# Sliding-window counter throttles for the unauthenticated endpoints that do expensive
+# work (password hashing, lookups, email). Each key keeps one counter per fixed window
+# in the cache backend; the rate is estimated as
+#   previous window * (share of it still inside the sliding window) + current window
+# which costs two counters per key instead of a timestamp per request.
+# DRF runs throttles before the view, so a rejected request never reaches the
+# serializer. Rates come from BLOG_THROTTLE_RATES ("<count>/<s|m|h|d>", None to disable).
+# Decisions are counted per scope in /api/metrics/ (blog_throttle_decisions_total).
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    scope = None
+    timer = time.time
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        rate = settings.BLOG_THROTTLE_RATES.get(self.scope)
+        key = self.get_key(request) if rate else None
+        if key is None:
+            return True
+        self.limit, self.duration = parse_rate(rate)
+
+        now = self.timer()
+        window, self.elapsed = divmod(now, self.duration)
+        current = f'blog:throttle:{self.scope}:{key}:{int(window)}'
+        previous = f'blog:throttle:{self.scope}:{key}:{int(window) - 1}'
+        counts = cache.get_many([previous, current])
+        self.previous, self.current = counts.get(previous, 0), counts.get(current, 0)
+
+        allowed = self.estimate() + 1 <= self.limit
+        registry.count_throttle(self.scope, allowed)
+        if allowed:
+            # Counters outlive their window by one window, while they still weigh in
+            if not cache.add(current, 1, 2 * self.duration):
+                try:
+                    cache.incr(current)
+                except ValueError:
+                    cache.set(current, 1, 2 * self.duration)
+        return allowed
+
+    def estimate(self):
+        return self.previous * (1 - self.elapsed / self.duration) + self.current
+
+    def wait(self):
+        # Seconds until one more request fits under the limit
+        room = self.limit - 1
+        if room < 0:
+            return None
+        if self.current <= room and self.previous:
+            # The previous window's share has to shrink
+            needed = (1 - (room - self.current) / self.previous) * self.duration
+            return max(needed - self.elapsed, 0)
+        # The current window is over the limit on its own: wait for it to become the previous one
+        return self.duration - self.elapsed + (1 - room / self.current) * self.duration
+
+
+class IPThrottle(SlidingWindowThrottle):
+    def get_key(self, request):
+        # Client address: REMOTE_ADDR, or X-Forwarded-For only as far as
+        # REST_FRAMEWORK['NUM_PROXIES'] trusted proxies go
+        return self.get_ident(request)
+
+
+class AccountThrottle(SlidingWindowThrottle):
+    # Request field naming the targeted account
+    field = None
+
+    def get_key(self, request):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return hashlib.md5(value.strip().lower().encode('utf-8')).hexdigest()
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginAccountThrottle(AccountThrottle):
+    scope = 'login_account'
+    field = 'username'
+
+
+class RegisterIPThrottle(IPThrottle):
+    scope = 'register_ip'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetAccountThrottle(AccountThrottle):
+    scope = 'password_reset_account'
+    field = 'email'
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import Blog, User
+from . import caching
+
+logger = logging.getLogger(__name__)
+
+# Resized, recompressed copies of uploaded images, made off the request path by
+# the generate_thumbnails worker. Files are named after a hash of the source
+# bytes, so identical uploads share variants and a re-run never re-encodes.
+WIDTHS = (320, 640, 1280)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANT_DIR = 'variants'
+# Bump when WIDTHS/FORMATS change, so files encoded with the old settings aren't reused
+PIPELINE_VERSION = 1
+
+# (model, file field, variants field)
+TARGETS = [
+    (Blog, 'image', 'image_variants'),
+    (User, 'profile_picture', 'profile_picture_variants'),
+]
+
+
+def variant_urls(storage, variants):
+    # {'webp': {'320': url, ...}, 'jpeg': {...}}; empty until the worker has run
+    return {
+        fmt: {width: storage.url(name) for width, name in variants[fmt].items()}
+        for fmt in FORMATS if fmt in variants
+    }
+
+
+def pending(model, field, attr):
+    # Rows with a file but no variants (new upload, or replaced since), through the
+    # indexed <attr>_pending flag set by reset_stale_variants()
+    return model._base_manager.filter(**{f'{attr}_pending': True}).order_by('pk')
+
+
+def generate_pending(batch_size=50):
+    # One batch per target; returns (generated, failed) counts
+    generated = failed = 0
+    for model, field, attr in TARGETS:
+        for row in pending(model, field, attr).only('pk', field)[:batch_size]:
+            file = getattr(row, field)
+            try:
+                variants = build_variants(file)
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                # Recorded so a broken upload isn't retried on every poll
+                failed += 1
+                variants = {'source': file.name, 'error': str(e)}
+                logger.warning("Could not make variants of %s %s (%s): %s", model.__name__, row.pk, file.name, e)
+            else:
+                generated += 1
+            # Only if the file is still the one we read; a newer upload stays pending
+            model._base_manager.filter(pk=row.pk, **{field: file.name}).update(
+                **{attr: variants, f'{attr}_pending': False}
+            )
+    if generated or failed:
+        caching.invalidate()  # update() skips post_save
+    return generated, failed
+
+
+def build_variants(file):
+    with file.open('rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    image = Image.open(BytesIO(data))
+    # Let the JPEG decoder downscale by a power of two when the source is much larger
+    image.draft('RGB', (max(WIDTHS), max(WIDTHS)))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    # Never upscale: images narrower than the smallest width get one copy at their own width
+    widths = [width for width in WIDTHS if width < image.width] or [image.width]
+
+    variants = {'source': file.name}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt, (pil_format, options) in FORMATS.items():
+            name = f'{VARIANT_DIR}/{digest[:2]}/{digest}-v{PIPELINE_VERSION}-{width}.{fmt}'
+            if not file.storage.exists(name):
+                frame = _flatten(resized) if pil_format == 'JPEG' and has_alpha else resized
+                buffer = BytesIO()
+                frame.save(buffer, pil_format, **options)
+                name = file.storage.save(name, ContentFile(buffer.getvalue()))
+            variants.setdefault(fmt, {})[str(width)] = name
+    return variants
+
+
+def _flatten(image):
+    # JPEG has no alpha: composite onto white instead of letting transparent pixels go black
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
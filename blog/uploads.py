@@ -0,0 +1,93 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException, UnsupportedMediaType
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+
+# Image uploads (Blog.image, User.profile_picture) stream straight to a temporary
+# file chunk by chunk instead of being buffered in memory, are rejected as soon as
+# the declared type, the first bytes or the running size give them away, and come
+# out carrying the sha256 of their content so identical images are stored once.
+
+# content type -> (extension, leading-bytes check)
+IMAGE_TYPES = {
+    'image/jpeg': ('.jpg', lambda head: head.startswith(b'\xff\xd8\xff')),
+    'image/png': ('.png', lambda head: head.startswith(b'\x89PNG\r\n\x1a\n')),
+    'image/gif': ('.gif', lambda head: head[:6] in (b'GIF87a', b'GIF89a')),
+    'image/webp': ('.webp', lambda head: head[:4] == b'RIFF' and head[8:12] == b'WEBP'),
+}
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Uploaded file is too large.'
+    default_code = 'upload_too_large'
+
+
+def sniff_image_type(head):
+    for content_type, (_, matches) in IMAGE_TYPES.items():
+        if matches(head):
+            return content_type
+    return None
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Whole body larger than one image plus the form fields: refuse before reading any of it
+        if content_length > settings.BLOG_MAX_UPLOAD_SIZE + settings.DATA_UPLOAD_MAX_MEMORY_SIZE:
+            raise UploadTooLarge()
+
+    def new_file(self, field_name, file_name, content_type, *args, **kwargs):
+        if content_type not in IMAGE_TYPES:
+            raise UnsupportedMediaType(content_type)
+        super().new_file(field_name, file_name, content_type, *args, **kwargs)
+        self.sha256 = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.sniffed_type = sniff_image_type(raw_data[:12])
+            if self.sniffed_type is None:
+                self.reject(UnsupportedMediaType(self.content_type))
+        if start + len(raw_data) > settings.BLOG_MAX_UPLOAD_SIZE:
+            self.reject(UploadTooLarge())
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.sha256.hexdigest()
+        # The bytes decide the type (and the stored extension), not the client's header
+        file.content_type = getattr(self, 'sniffed_type', None) or file.content_type
+        return file
+
+    def reject(self, error):
+        # Parsing stops here; drop the partial temporary file right away
+        self.upload_interrupted()
+        raise error
+
+
+class ImageMultiPartParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return super().parse(stream, media_type, parser_context)
+
+
+# For views that accept image uploads
+UPLOAD_PARSERS = [JSONParser, FormParser, ImageMultiPartParser]
+
+
+def deduplicate(file, field):
+    # Names stored files after their content hash; an image that is already stored
+    # is referenced (returned as its name) instead of being written again
+    digest = getattr(file, 'sha256', None)
+    if digest is None:
+        return file
+    extension = IMAGE_TYPES.get(file.content_type, ('',))[0]
+    name = field.generate_filename(None, digest + extension)
+    if field.storage.exists(name):
+        return name
+    file.name = digest + extension
+    return file
@@ -6,11 +6,16 @@ from .views import (register,
     blog_list_create,
     blog_detail,
     blog_detail_by_title,
+    blog_detail_by_slug,
+    blog_bulk_import,
+    blog_export,
     comment_list_create,
     password_reset_request,
     password_reset_confirm
 )
 from rest_framework_simplejwt.views import TokenRefreshView
+from . import async_views
+from .metrics import metrics_view
 
 urlpatterns = [
     # -------------------------
@@ -31,16 +36,32 @@ urlpatterns = [
     # -------------------------
     path('blogs/', blog_list_create, name='blog-list-create'),
     path('blogs/<int:pk>/', blog_detail, name='blog-detail'),
+    path('blogs/bulk/', blog_bulk_import, name='blog-bulk-import'),
+    path('blogs/export/', blog_export, name='blog-export'),
     path('blogs/title/<str:title>/', blog_detail_by_title, name='blog-detail-by-title'),
+    path('blogs/slug/<slug:slug>/', blog_detail_by_slug, name='blog-detail-by-slug'),
 
     # -------------------------
     # COMMENTS
     # -------------------------
     path('blogs/<int:blog_id>/comments/', comment_list_create, name='comment-list-create'),
 
+    # -------------------------
+    # ASYNC (read-only, for ASGI deployments)
+    # -------------------------
+    path('async/categories/', async_views.category_list, name='async-category-list'),
+    path('async/blogs/', async_views.blog_list, name='async-blog-list'),
+    path('async/blogs/<int:pk>/', async_views.blog_detail, name='async-blog-detail'),
+    path('async/blogs/<int:blog_id>/comments/', async_views.comment_list, name='async-comment-list'),
+
     # -------------------------
     # PASSWORD RESET
     # -------------------------
     path('auth/reset-password/', password_reset_request, name='password-reset-request'),
     path('auth/reset-password-confirm/<str:uidb64>/<str:token>/', password_reset_confirm, name='password-reset-confirm'),
+
+    # -------------------------
+    # MONITORING
+    # -------------------------
+    path('metrics/', metrics_view, name='metrics'),
 ]
@@ -1,25 +1,38 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, throttle_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.db import DatabaseError, OperationalError
-from django.db.models import Q
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.contrib.auth import password_validation
-from .models import User, Category, Blog, Comment
+from .models import User, Blog, Comment
+from .pagination import BlogCursorPagination, BlogSearchPagination, CommentCursorPagination
+from .search import search_blogs
+from .category_cache import categories
+from . import caching
+from .outbox import enqueue_mail
+from .bulk import MAX_IMPORT_ITEMS, export_blogs, import_blogs
+from .uploads import UPLOAD_PARSERS
+from .blacklist import RefreshToken
+from .throttling import (LoginAccountThrottle, LoginIPThrottle, PasswordResetAccountThrottle,
+                         PasswordResetIPThrottle, RegisterIPThrottle)
+from .conditional import blog_validators, comment_validators, not_modified, set_validators
 from .serializers import (UserSerailizer,CategorySerializer,BlogSerializer,CommentSerializer,RegisterSerializer,
-    MyTokenObtainPairSerializer,PasswordResetSerializer,PasswordResetConfirmSerializer)
+    MyTokenObtainPairSerializer,PasswordResetSerializer,PasswordResetConfirmSerializer,BlogImportSerializer,
+    BlogRowSerializer)
 
 
 # REGISTER
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterIPThrottle])
+@parser_classes(UPLOAD_PARSERS)
 def register(request):
     serializer = RegisterSerializer(data=request.data)
     if serializer.is_valid():
@@ -36,6 +49,7 @@ def register(request):
 # LOGIN (JWT)
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    throttle_classes = [LoginIPThrottle, LoginAccountThrottle]
 
     def post(self, request, *args, **kwargs):
         try:
@@ -57,7 +71,7 @@ def logout(request):
             return Response({"detail": "Refresh token is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         token = RefreshToken(refresh_token)
-        token.blacklist()  # Requires simplejwt blacklist app enabled
+        token.blacklist()
         return Response({"message": "User logged out successfully."}, status=status.HTTP_205_RESET_CONTENT)
     except Exception as e:
         return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -68,8 +82,7 @@ def logout(request):
 @permission_classes([IsAuthenticated])
 def category_list_create(request):
     if request.method == 'GET':
-        categories = Category.objects.all()
-        serializer = CategorySerializer(categories, many=True)
+        serializer = CategorySerializer(categories.all(), many=True)
         return Response(serializer.data)
 
     if request.method == 'POST':
@@ -83,51 +96,150 @@ def category_list_create(request):
 
 
 # BLOG VIEWS (with filtering/search/mine)
+def filter_blogs(request):
+    # Published feed queryset for the request's filters, plus the paginator matching its ordering
+    blogs = Blog.objects.filter(is_published=True).select_related('author', 'category')
+
+    # Filter by category
+    category_id = request.GET.get('category')
+    if category_id:
+        blogs = blogs.filter(category_id=category_id)
+
+    # Full-text search on title/content, ranked by relevance
+    search_query = request.GET.get('search')
+    if search_query:
+        blogs = search_blogs(blogs, search_query)
+
+    # Show only user's own blogs
+    if request.GET.get('mine') == 'true':
+        blogs = blogs.filter(author_id=request.user.pk)
+
+    paginator = BlogSearchPagination() if search_query else BlogCursorPagination()
+    return blogs, paginator
+
+
+def blog_list_fields(request):
+    # `fields=title,slug,...` and/or `excerpt=true` (content -> truncated excerpt).
+    # None means the full representation.
+    fields = request.GET.get('fields')
+    excerpt = request.GET.get('excerpt') == 'true'
+    if not fields and not excerpt:
+        return None
+    if fields:
+        fields = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    else:
+        fields = list(BlogRowSerializer.default_fields)
+    if excerpt:
+        fields = ['excerpt' if name == 'content' else name for name in fields]
+    unknown = [name for name in fields if name not in BlogRowSerializer.field_columns]
+    if unknown or not fields:
+        raise ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}" if unknown else "No fields given."})
+    return fields
+
+
+def use_row_serializer(fields):
+    # Sparse/excerpt responses only exist on the row serializer
+    return fields is not None or settings.BLOG_FAST_SERIALIZER
+
+
+def blog_page_queryset(blogs, paginator, fields=None):
+    # Row path reads .values() rows: only the requested columns plus those the cursor is built from
+    if use_row_serializer(fields):
+        return BlogRowSerializer.queryset(blogs, [field.lstrip('-') for field in paginator.ordering], fields)
+    return blogs
+
+
+def serialize_blog_page(paginator, rows, fields=None):
+    # `rows`: the evaluated paginator.page_queryset(blog_page_queryset(...))
+    page = paginator.paginate_rows(rows)
+    if use_row_serializer(fields):
+        return paginator.get_paginated_data(BlogRowSerializer(page, fields).data)
+    return paginator.get_paginated_data(BlogSerializer(page, many=True).data)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@parser_classes(UPLOAD_PARSERS)
 def blog_list_create(request):
     if request.method == 'GET':
-        blogs = Blog.objects.filter(is_published=True)
-
-        # Filter by category
-        category_id = request.GET.get('category')
-        if category_id:
-            blogs = blogs.filter(category_id=category_id)
-
-        # Search by title or content
-        search_query = request.GET.get('search')
-        if search_query:
-            blogs = blogs.filter(Q(title__icontains=search_query) | Q(content__icontains=search_query))
-
-        # Show only user's own blogs
-        if request.GET.get('mine') == 'true':
-            blogs = blogs.filter(author=request.user)
-
-        serializer = BlogSerializer(blogs, many=True)
-        return Response(serializer.data)
+        cache_key = caching.feed_key(request)
+        data = caching.get_cached(cache_key)
+        if data is not None:
+            return Response(data)
+
+        fields = blog_list_fields(request)
+        blogs, paginator = filter_blogs(request)
+        rows = list(paginator.page_queryset(blog_page_queryset(blogs, paginator, fields), request))
+        data = serialize_blog_page(paginator, rows, fields)
+        caching.set_cached(cache_key, data)
+        return Response(data)
 
     if request.method == 'POST':
         serializer = BlogSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(author=request.user)
+            serializer.save(author_id=request.user.pk)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# BULK IMPORT / EXPORT (admin only)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def blog_bulk_import(request):
+    if not request.user.is_admin:
+        return Response({"detail": "Only admin can import blogs"}, status=status.HTTP_403_FORBIDDEN)
+    if not isinstance(request.data, list) or not request.data:
+        return Response({"detail": "Expected a non-empty list of blogs."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(request.data) > MAX_IMPORT_ITEMS:
+        return Response({"detail": f"At most {MAX_IMPORT_ITEMS} blogs per request."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = BlogImportSerializer(data=request.data, many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    blogs = import_blogs(serializer.validated_data, author=request.user)
+    return Response({"created": len(blogs), "ids": [blog.pk for blog in blogs]}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def blog_export(request):
+    if not request.user.is_admin:
+        return Response({"detail": "Only admin can export blogs"}, status=status.HTTP_403_FORBIDDEN)
+    response = StreamingHttpResponse(export_blogs(), content_type='application/x-ndjson')
+    response['Content-Disposition'] = 'attachment; filename="blogs.ndjson"'
+    return response
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
+@parser_classes(UPLOAD_PARSERS)
 def blog_detail(request, pk):
+    if request.method == 'GET':
+        cache_key = caching.detail_key(pk)
+        cached = caching.get_cached(cache_key)
+        if cached is not None:
+            etag, last_modified = cached['etag'], cached['last_modified']
+            return not_modified(request, etag, last_modified) or set_validators(
+                Response(cached['data']), etag, last_modified
+            )
+
     try:
-        blog = Blog.objects.get(pk=pk)
+        blog = Blog.objects.select_related('author', 'category').get(pk=pk)
     except Blog.DoesNotExist:
         return Response({"detail": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
+        etag, last_modified = blog_validators(blog)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
         serializer = BlogSerializer(blog)
-        return Response(serializer.data)
+        caching.set_cached(cache_key, {'etag': etag, 'last_modified': last_modified, 'data': serializer.data})
+        return set_validators(Response(serializer.data), etag, last_modified)
 
     if request.method == 'PUT':
-        if blog.author != request.user and not request.user.is_admin:
+        if blog.author_id != request.user.pk and not request.user.is_admin:
             return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
         serializer = BlogSerializer(blog, data=request.data, partial=True)
         if serializer.is_valid():
@@ -136,25 +248,50 @@ def blog_detail(request, pk):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     if request.method == 'DELETE':
-        if blog.author != request.user and not request.user.is_admin:
+        if blog.author_id != request.user.pk and not request.user.is_admin:
             return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
-        blog.delete()
+        blog.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
+@parser_classes(UPLOAD_PARSERS)
 def blog_detail_by_title(request, title):
+    # Titles aren't unique: take the oldest blog with exactly this title (blog_title_idx).
+    # Not through the slug, which is kept when the title changes
+    blog = (
+        Blog.objects.select_related('author', 'category')
+        .filter(title=title)
+        .order_by('pk')
+        .first()
+    )
+    if blog is None:
+        return Response({"detail": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+    return _blog_detail(request, blog)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@parser_classes(UPLOAD_PARSERS)
+def blog_detail_by_slug(request, slug):
     try:
-        blog = Blog.objects.get(title=title)
+        blog = Blog.objects.select_related('author', 'category').get(slug=slug)
     except Blog.DoesNotExist:
         return Response({"detail": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
+    return _blog_detail(request, blog)
 
+
+def _blog_detail(request, blog):
     if request.method == 'GET':
+        etag, last_modified = blog_validators(blog)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
         serializer = BlogSerializer(blog)
-        return Response(serializer.data)
+        return set_validators(Response(serializer.data), etag, last_modified)
 
     if request.method == 'PUT':
-        if blog.author != request.user and not request.user.is_admin:
+        if blog.author_id != request.user.pk and not request.user.is_admin:
             return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
         serializer = BlogSerializer(blog, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
@@ -163,9 +300,9 @@ def blog_detail_by_title(request, title):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     if request.method == 'DELETE':
-        if blog.author != request.user and not request.user.is_admin:
+        if blog.author_id != request.user.pk and not request.user.is_admin:
             return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
-        blog.delete()
+        blog.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -179,14 +316,20 @@ def comment_list_create(request, blog_id):
         return Response({"detail": "Blog not found"}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        comments = Comment.objects.filter(blog=blog)
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        etag, last_modified = comment_validators(request, blog)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        comments = Comment.objects.filter(blog=blog, deleted_at__isnull=True).select_related('author')
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request)
+        serializer = CommentSerializer(page, many=True)
+        return set_validators(paginator.get_paginated_response(serializer.data), etag, last_modified)
 
     if request.method == 'POST':
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(author=request.user, blog=blog)
+            serializer.save(author_id=request.user.pk, blog=blog)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -194,6 +337,7 @@ def comment_list_create(request, blog_id):
 # PASSWORD RESET REQUEST
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PasswordResetIPThrottle, PasswordResetAccountThrottle])
 def password_reset_request(request):
     serializer = PasswordResetSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -211,7 +355,8 @@ def password_reset_request(request):
     token = default_token_generator.make_token(user)
     reset_link = f"http://127.0.0.1:8000/api/auth/reset-password-confirm/{uid}/{token}/"
 
-    send_mail(
+    # Queued, not sent inline: the send_outbox_emails worker delivers it
+    enqueue_mail(
         subject="Password Reset",
         message=f"Click the link to reset your password: {reset_link}",
         from_email=settings.DEFAULT_FROM_EMAIL,
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,13 +44,22 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'blog',
     'rest_framework',
-    
+    'rest_framework_simplejwt.token_blacklist',
 ]
 
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication without the per-request User query (blog.authentication)
+        'blog.authentication.ClaimsJWTAuthentication',
+    ),
+    # Reverse proxies in front of the app. Throttles key on the client IP: with 0, that's
+    # REMOTE_ADDR and X-Forwarded-For (client-controlled) is ignored
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    # Same bytes as JSONRenderer, encoded with orjson when installed (blog.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'blog.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     
 }
@@ -60,8 +70,12 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Blacklist checks go through blog.blacklist's bloom filter
+    'TOKEN_REFRESH_SERIALIZER': 'blog.serializers.RefreshTokenSerializer',
 }
 MIDDLEWARE = [
+    # First, so its timings cover the whole stack; removes itself unless BLOG_METRICS_ENABLED
+    'blog.metrics.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -116,6 +130,33 @@ DATABASES = {
 }
 }
 
+# Database connection reuse, selected with DB_CONN_MODE:
+#   close       - new connection (TCP + auth handshake) for every request
+#   persistent  - each worker thread keeps its connection for DB_CONN_MAX_AGE seconds,
+#                 checked with a cheap ping before reuse
+#   pool        - connections shared by all threads of a process through
+#                 django-db-connection-pool (pip install django-db-connection-pool[mysql])
+# Under ASGI (the async views in blog.async_views) Django advises against persistent
+# connections: each request may run in a new thread, so CONN_MAX_AGE > 0 leaves a
+# connection open per thread. Set DB_CONN_MODE=close or pool for ASGI deployments.
+DB_CONN_MODE = os.getenv('DB_CONN_MODE', 'persistent')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+if DB_CONN_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONN_MODE == 'pool':
+    DATABASES['default']['ENGINE'] = 'dj_db_conn_pool.backends.mysql'
+    DATABASES['default']['POOL_OPTIONS'] = {
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', 10)),
+        'MAX_OVERFLOW': int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+        'TIMEOUT': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'RECYCLE': DB_CONN_MAX_AGE,
+        'PRE_PING': True,
+    }
+elif DB_CONN_MODE != 'close':
+    raise ImproperlyConfigured(f"DB_CONN_MODE must be close, persistent or pool, not {DB_CONN_MODE!r}")
+
 
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
@@ -127,6 +168,50 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Blogging Platform <noreply
 
 AUTH_USER_MODEL = 'blog.User'
 
+# Blog search: 'fulltext' (MySQL FULLTEXT index) or 'inverted' (SearchTerm table).
+# Empty picks 'fulltext' on MySQL and 'inverted' everywhere else.
+BLOG_SEARCH_BACKEND = os.getenv('BLOG_SEARCH_BACKEND', '')
+
+# Cache (response cache for the blog feed/detail). Local memory by default;
+# point CACHE_BACKEND at memcached/redis/file when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+BLOG_CACHE_TIMEOUT = int(os.getenv('BLOG_CACHE_TIMEOUT', 300))
+# Max age (seconds) of each process's in-memory copy of the category table
+BLOG_CATEGORY_CACHE_TTL = int(os.getenv('BLOG_CATEGORY_CACHE_TTL', 300))
+# Serve GET /api/blogs/ through BlogRowSerializer (.values() rows) + the orjson renderer
+BLOG_FAST_SERIALIZER = os.getenv('BLOG_FAST_SERIALIZER', 'True') == 'True'
+# Build request.user from JWT claims instead of loading the User row (blog.authentication)
+BLOG_STATELESS_AUTH = os.getenv('BLOG_STATELESS_AUTH', 'True') == 'True'
+# How long (seconds) a user's cached is_active/is_admin may lag writes that skip signals,
+# and writes made by other workers when the cache is not shared
+BLOG_AUTH_CACHE_TTL = int(os.getenv('BLOG_AUTH_CACHE_TTL', 60))
+# Bloom filter in front of the refresh token blacklist, rebuilt from the database
+# every BLOG_BLACKLIST_FILTER_TTL seconds (blog.blacklist). Workers learn about each
+# other's blacklistings through the cache, so it defaults to off with the per-process
+# local-memory cache: there a logged-out token would pass other workers' filters
+# until their next rebuild
+SHARED_CACHE = not CACHES['default']['BACKEND'].endswith(('LocMemCache', 'DummyCache'))
+BLOG_BLACKLIST_FILTER = os.getenv('BLOG_BLACKLIST_FILTER', str(SHARED_CACHE)) == 'True'
+BLOG_BLACKLIST_FILTER_TTL = int(os.getenv('BLOG_BLACKLIST_FILTER_TTL', 600))
+# Sliding-window limits for login/register/password reset, per client IP and per
+# targeted account ("<count>/<s|m|h|d>", empty to disable a scope; blog.throttling).
+# Shared across workers only with a shared cache backend.
+BLOG_THROTTLE_RATES = {
+    scope: os.getenv(f'BLOG_THROTTLE_{scope.upper()}', default) or None
+    for scope, default in [
+        ('login_ip', '30/m'),
+        ('login_account', '10/m'),
+        ('register_ip', '10/h'),
+        ('password_reset_ip', '10/h'),
+        ('password_reset_account', '3/h'),
+    ]
+}
+
 
 
 
@@ -166,6 +251,16 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded images and their generated variants (see blog.thumbnails)
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+# Request instrumentation (blog.metrics): Server-Timing header + Prometheus text at /api/metrics/
+BLOG_METRICS_ENABLED = os.getenv('BLOG_METRICS_ENABLED', 'False') == 'True'
+# Bearer token required by /api/metrics/ when set
+BLOG_METRICS_TOKEN = os.getenv('BLOG_METRICS_TOKEN', '')
+# Largest accepted image upload (bytes); see blog.uploads
+BLOG_MAX_UPLOAD_SIZE = int(os.getenv('BLOG_MAX_UPLOAD_SIZE', 5 * 1024 * 1024))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 